@@ -3,28 +3,79 @@ ExaPG Management UI - Backend API
 FastAPI-basierte Backend-Anwendung für die Web-basierte Verwaltung von ExaPG
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+import psycopg2.sql
+import anyio.to_thread
+import asyncio
+import base64
+import hashlib
 import json
+import logging
 import os
+import socket
+import threading
+import time
 from datetime import datetime, timedelta
 import bcrypt
 import jwt
 from contextlib import contextmanager
 from functools import lru_cache
+from collections import OrderedDict
 import random
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 # Konfiguration
 DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:{os.getenv('POSTGRES_PASSWORD', 'postgres')}@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', '5432')}/{os.getenv('POSTGRES_DB', 'postgres')}")
 SECRET_KEY = os.getenv("SECRET_KEY", "exapg-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 Stunden
 
+# Verbindungspool (pro Uvicorn-Worker-Prozess)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # Sekunden Wartezeit auf eine freie Verbindung
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "40"))  # Threads für synchrone Endpunkte
+
+# Cache für authentifizierte Benutzer (pro Uvicorn-Worker-Prozess). Änderungen an
+# Benutzern werden nur im eigenen Prozess invalidiert; die TTL ist daher die obere
+# Grenze, wie lange andere Worker veraltete Rechte sehen können.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))  # Sekunden
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+# Intervall des Dashboard-Collectors
+DASHBOARD_REFRESH_INTERVAL = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", "5"))  # Sekunden
+
+# Live-Metriken per Server-Sent Events
+LIVE_SAMPLE_INTERVAL = float(os.getenv("LIVE_SAMPLE_INTERVAL", "5"))  # Sekunden
+LIVE_KEEPALIVE_INTERVAL = float(os.getenv("LIVE_KEEPALIVE_INTERVAL", "15"))  # Sekunden
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "32"))  # gepufferte Events pro Client
+
+# Metrik-Historie (gemeinsame Tabelle, aufgezeichnet von einem gewählten Worker-Prozess)
+METRICS_HISTORY_INTERVAL = float(os.getenv("METRICS_HISTORY_INTERVAL", "10"))  # Sekunden
+METRICS_HISTORY_MAX_POINTS = int(os.getenv("METRICS_HISTORY_MAX_POINTS", "500"))  # Punkte pro Antwort bei resolution=auto
+DB_CPU_CORES = int(os.getenv("DB_CPU_CORES", str(os.cpu_count() or 1)))  # CPU-Kerne des Datenbankservers
+
+# Query-Monitoring
+QUERY_TEXT_LIMIT = int(os.getenv("QUERY_TEXT_LIMIT", "1024"))  # Zeichen Query-Text pro Zeile
+QUERY_PAGE_MAX = int(os.getenv("QUERY_PAGE_MAX", "500"))  # maximale Seitengröße
+
+# Asynchrone ETL-Ausführung
+ETL_RUNNER_WORKERS = int(os.getenv("ETL_RUNNER_WORKERS", "2"))  # gleichzeitige Jobs pro API-Worker-Prozess
+ETL_RUNNER_POLL_INTERVAL = float(os.getenv("ETL_RUNNER_POLL_INTERVAL", "2"))  # Sekunden
+
 app = FastAPI(
     title="ExaPG Management API",
     description="API für die Verwaltung und Überwachung von ExaPG-Clustern",
@@ -99,20 +150,54 @@ class SystemMetrics(BaseModel):
     cluster_health: str
 
 # Datenbankverbindung
+_db_pool = None
+_db_pool_lock = threading.Lock()
+_db_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+def get_db_pool():
+    """Liefert den prozessweiten Verbindungspool und legt ihn beim ersten Zugriff an"""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = psycopg2.pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DATABASE_URL)
+    return _db_pool
+
+def close_db_pool():
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.closeall()
+            _db_pool = None
+
 @contextmanager
 def get_db_connection():
+    # ThreadedConnectionPool wirft bei Erschöpfung sofort einen Fehler; die
+    # Semaphore lässt Anfragen stattdessen bis DB_POOL_TIMEOUT auf eine Verbindung warten
+    if not _db_pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise psycopg2.pool.PoolError(f"Keine freie Datenbankverbindung innerhalb von {DB_POOL_TIMEOUT}s")
+    pool = None
     conn = None
+    broken = False
     try:
-        conn = psycopg2.connect(DATABASE_URL)
+        pool = get_db_pool()
+        conn = pool.getconn()
         conn.autocommit = True
         yield conn
     except Exception as e:
         if conn:
-            conn.rollback()
+            # Abgebrochene Verbindungen nicht an den Pool zurückgeben
+            broken = conn.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
         raise e
     finally:
         if conn:
-            conn.close()
+            pool.putconn(conn, close=broken or bool(conn.closed))
+        _db_pool_slots.release()
 
 def get_db_cursor():
     with get_db_connection() as conn:
@@ -136,67 +221,111 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class PrincipalCache:
+    """LRU-Cache mit TTL für Benutzerdatensätze, Schlüssel ist der Token-Subject"""
+    
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, username: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(username)
+            if entry is None:
+                return None
+            expires, principal = entry
+            if expires < time.monotonic():
+                del self.entries[username]
+                return None
+            self.entries.move_to_end(username)
+            return dict(principal)
+    
+    def put(self, username: str, principal: dict):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[username] = (time.monotonic() + self.ttl, dict(principal))
+            self.entries.move_to_end(username)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def invalidate(self, username: Optional[str] = None):
+        """Entfernt einen Benutzer oder (ohne Argument) alle Einträge"""
+        with self.lock:
+            if username is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(username, None)
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_SIZE)
+
+# Wird von init_database beim Start gesetzt, damit die Existenzprüfung
+# nicht bei jeder Anfrage erneut gegen information_schema läuft
+users_table_ready = False
+
+def load_principal(username: str) -> Optional[dict]:
+    """Liest den Benutzer aus der Datenbank; unbekannte Benutzer werden als Demo-Benutzer behandelt"""
+    if users_table_ready:
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.execute(
+                        "SELECT username, email, is_admin FROM management_ui.users WHERE username = %s",
+                        (username,)
+                    )
+                    user = cursor.fetchone()
+                    if user is not None:
+                        return dict(user)
+            logger.debug("Benutzer %s nicht gefunden, verwende Demo-Benutzer", username)
+        except Exception as e:
+            # Fehler nicht cachen, damit der nächste Request es erneut versucht
+            logger.warning("Fehler beim Suchen des Benutzers %s: %s", username, e)
+            return None
+    
+    return {
+        "username": username,
+        "email": f"{username}@exapg.demo",
+        "is_admin": username == "admin"
+    }
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        print(f"Authentifizierungs-Token: {credentials.credentials[:10]}...")
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            print("Token ungültig: kein Benutzername im Token")
+            logger.info("Token ungültig: kein Benutzername im Token")
             raise HTTPException(
                 status_code=401, 
                 detail="Ungültiges Token: Kein Benutzername gefunden"
             )
-
-        print(f"Suche Benutzer {username} in der Datenbank...")
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                try:
-                    # Prüfe, ob das Schema und die Tabelle existieren
-                    cursor.execute("""
-                        SELECT EXISTS (
-                            SELECT 1 FROM information_schema.tables 
-                            WHERE table_schema = 'management_ui' AND table_name = 'users'
-                        ) AS table_exists
-                    """)
-                    
-                    table_exists = cursor.fetchone()['table_exists']
-                    print(f"Users-Tabelle existiert: {table_exists}")
-                    
-                    if table_exists:
-                        cursor.execute("SELECT * FROM management_ui.users WHERE username = %s", (username,))
-                        user = cursor.fetchone()
-                        if user is not None:
-                            print(f"Benutzer {username} gefunden")
-                            return user
-                        
-                        print(f"Benutzer {username} nicht gefunden")
-                    else:
-                        print(f"Users-Tabelle nicht gefunden, erstelle Demo-Benutzer...")
-                except Exception as e:
-                    print(f"Fehler beim Suchen des Benutzers: {str(e)}")
         
-        # Fallback: Demo-Benutzer zurückgeben
-        print(f"Verwende Demo-Benutzer für {username}")
-        return {
-            "username": username,
-            "email": f"{username}@exapg.demo",
-            "is_admin": username == "admin"
-        }
+        user = principal_cache.get(username)
+        if user is not None:
+            return user
+        
+        user = load_principal(username)
+        if user is None:
+            raise HTTPException(status_code=401, detail="Authentifizierungsfehler")
+        principal_cache.put(username, user)
+        return user
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
-        print("Token abgelaufen")
+        logger.info("Token abgelaufen")
         raise HTTPException(
             status_code=401,
             detail="Token abgelaufen"
         )
     except jwt.InvalidTokenError as e:
-        print(f"Ungültiges Token: {str(e)}")
+        logger.info("Ungültiges Token: %s", e)
         raise HTTPException(
             status_code=401,
             detail="Ungültiges Token"
         )
     except Exception as e:
-        print(f"Allgemeiner Authentifizierungsfehler: {str(e)}")
+        logger.error("Allgemeiner Authentifizierungsfehler: %s", e)
         raise HTTPException(
             status_code=401,
             detail="Authentifizierungsfehler"
@@ -207,8 +336,18 @@ def get_admin_user(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+def get_stream_user(request: Request, token: Optional[str] = None):
+    """EventSource kann keine Header setzen, daher ist das Token auch als Query-Parameter erlaubt"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Nicht authentifiziert")
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
 # Datenbankinitialisierung
 def init_database():
+    global users_table_ready
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             # Erstelle Schema für Management-UI
@@ -235,6 +374,8 @@ def init_database():
                     INSERT INTO management_ui.users (username, password_hash, email, is_admin)
                     VALUES ('admin', %s, 'admin@exapg.local', TRUE)
                 """, (admin_password,))
+            users_table_ready = True
+            principal_cache.invalidate()
             
             # Erstelle Tabelle für Cluster-Knoten
             cursor.execute("""
@@ -259,12 +400,977 @@ def init_database():
                     timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            
+            # Erstelle Warteschlange für asynchrone ETL-Läufe
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS management_ui.etl_job_queue (
+                    queue_id BIGSERIAL PRIMARY KEY,
+                    job_id INTEGER NOT NULL,
+                    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+                    truncate_target BOOLEAN NOT NULL DEFAULT FALSE,
+                    requested_by VARCHAR(100),
+                    enqueued_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP WITH TIME ZONE,
+                    finished_at TIMESTAMP WITH TIME ZONE,
+                    worker VARCHAR(255),
+                    backend_pid INTEGER,
+                    etl_run_id INTEGER,
+                    result JSONB,
+                    messages JSONB,
+                    error_message TEXT
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS etl_job_queue_open_idx
+                ON management_ui.etl_job_queue (job_id, queue_id)
+                WHERE status IN ('queued', 'running')
+            """)
+            
+            # Erstelle Tabelle für die Metrik-Historie (Rohwerte und Rollups)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS management_ui.metric_history (
+                    metric VARCHAR(100) NOT NULL,
+                    resolution VARCHAR(10) NOT NULL, -- 'raw', '1m', '5m', '1h'
+                    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+                    total DOUBLE PRECISION NOT NULL,
+                    samples INTEGER NOT NULL,
+                    min_value DOUBLE PRECISION NOT NULL,
+                    max_value DOUBLE PRECISION NOT NULL,
+                    PRIMARY KEY (metric, resolution, bucket)
+                )
+            """)
+
+# Dashboard-Snapshot
+# Eine einzige Abfrage für die komplette Übersicht. Optionale Tabellen werden
+# über to_regclass geprüft und nur dann per query_to_xml gelesen, wenn sie
+# existieren; so bleibt es bei einem Roundtrip ohne information_schema-Abfragen.
+DASHBOARD_OVERVIEW_SQL = """
+    WITH snapshot AS (
+        SELECT
+            (SELECT COUNT(*) FROM pg_stat_activity WHERE state = 'active') AS active_connections,
+            pg_size_pretty(pg_database_size(current_database())) AS database_size,
+            CASE WHEN to_regclass('etl_framework.etl_jobs') IS NOT NULL THEN
+                query_to_xml('SELECT COUNT(*) AS total, COUNT(CASE WHEN enabled THEN 1 END) AS active
+                              FROM etl_framework.etl_jobs', false, true, '')
+            END AS etl_stats,
+            CASE WHEN to_regclass('management_ui.cluster_nodes') IS NOT NULL THEN
+                query_to_xml('SELECT COUNT(*) AS total, COUNT(CASE WHEN status = ''online'' THEN 1 END) AS active
+                              FROM management_ui.cluster_nodes', false, true, '')
+            END AS node_stats
+    )
+    SELECT
+        active_connections,
+        database_size,
+        COALESCE((xpath('/row/total/text()', etl_stats))[1]::text::bigint, 0) AS total_etl_jobs,
+        COALESCE((xpath('/row/active/text()', etl_stats))[1]::text::bigint, 0) AS active_etl_jobs,
+        COALESCE((xpath('/row/total/text()', node_stats))[1]::text::bigint, 0) AS total_nodes,
+        COALESCE((xpath('/row/active/text()', node_stats))[1]::text::bigint, 0) AS online_nodes
+    FROM snapshot
+"""
+
+class DashboardCollector:
+    """Aktualisiert die Dashboard-Übersicht periodisch im Hintergrund
+    
+    Alle Anfragen werden aus dem zuletzt gesammelten Snapshot beantwortet,
+    die Datenbanklast hängt damit nicht mehr von der Anzahl der Betrachter ab.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.snapshot = None
+        self.etag = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def collect(self) -> dict:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(DASHBOARD_OVERVIEW_SQL)
+                row = cursor.fetchone()
+        
+        return {
+            "active_connections": row['active_connections'],
+            "total_etl_jobs": row['total_etl_jobs'],
+            "active_etl_jobs": row['active_etl_jobs'],
+            "total_nodes": row['total_nodes'],
+            "online_nodes": row['online_nodes'],
+            "database_size": row['database_size'],
+            "cluster_health": "healthy" if row['online_nodes'] == row['total_nodes'] else "warning"
+        }
+    
+    def refresh(self):
+        snapshot = self.collect()
+        etag = '"%s"' % hashlib.sha1(json.dumps(snapshot, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        with self.lock:
+            self.snapshot = snapshot
+            self.etag = etag
+    
+    def get(self):
+        """Liefert (snapshot, etag); sammelt synchron, falls noch kein Snapshot vorliegt"""
+        with self.lock:
+            if self.snapshot is not None:
+                return self.snapshot, self.etag
+        self.refresh()
+        with self.lock:
+            return self.snapshot, self.etag
+    
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="dashboard-collector", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 5)
+            self.thread = None
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # Letzten gültigen Snapshot weiter ausliefern
+                logger.warning("Dashboard-Snapshot konnte nicht aktualisiert werden: %s", e)
+            self.stop_event.wait(self.interval)
+
+dashboard_collector = DashboardCollector(DASHBOARD_REFRESH_INTERVAL)
+
+def snapshot_response(request: Request, content, etag: str, max_age: float):
+    """Antwort mit ETag; bei passendem If-None-Match ohne Body (304)"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(max_age)}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
+
+class CpuUsageTracker:
+    """Leitet die CPU-Auslastung aus der Differenz zweier pg_stat_statements-Stände ab
+    
+    Die Summe der Ausführungszeit seit Postmaster-Start sagt nichts über die
+    aktuelle Last aus; relevant ist nur der Zuwachs zwischen zwei Messungen,
+    bezogen auf die verstrichene Zeit und die Anzahl der Kerne.
+    """
+    
+    MIN_INTERVAL = 1.0  # Sekunden; kürzere Abstände liefern den letzten Wert
+    
+    def __init__(self, cores: int):
+        self.cores = max(cores, 1)
+        self.last_total = None
+        self.last_time = None
+        self.last_usage = None
+        self.lock = threading.Lock()
+    
+    def observe(self, total_ms: float, sampled_at: float) -> Optional[float]:
+        with self.lock:
+            if self.last_total is not None and sampled_at - self.last_time < self.MIN_INTERVAL:
+                return self.last_usage
+            usage = None
+            # Kleinerer Stand bedeutet pg_stat_statements_reset(); dann neu beginnen
+            if self.last_total is not None and total_ms >= self.last_total:
+                elapsed_ms = (sampled_at - self.last_time) * 1000
+                usage = min((total_ms - self.last_total) / (elapsed_ms * self.cores) * 100, 100.0)
+            self.last_total = total_ms
+            self.last_time = sampled_at
+            self.last_usage = usage
+            return usage
+
+cpu_tracker = CpuUsageTracker(DB_CPU_CORES)
+
+def collect_system_metrics(cursor) -> List[dict]:
+    # Schema und Zeitspalte von pg_stat_statements (total_exec_time ab PostgreSQL 13)
+    cursor.execute("""
+        SELECT
+            n.nspname AS schema_name,
+            (SELECT a.attname FROM pg_attribute a
+             WHERE a.attrelid = c.oid AND a.attname IN ('total_exec_time', 'total_time')
+             ORDER BY a.attname = 'total_exec_time' DESC
+             LIMIT 1) AS time_column
+        FROM pg_extension e
+        JOIN pg_namespace n ON n.oid = e.extnamespace
+        JOIN pg_class c ON c.relnamespace = e.extnamespace AND c.relname = 'pg_stat_statements'
+        WHERE e.extname = 'pg_stat_statements'
+    """)
+    
+    statements = cursor.fetchone()
+    
+    metrics = []
+    
+    # CPU-Auslastung - Differenz der Ausführungszeit seit der letzten Messung
+    cpu_usage = None
+    if statements and statements['time_column']:
+        cursor.execute(psycopg2.sql.SQL("""
+            SELECT
+                COALESCE(sum({column}), 0) AS total_time,
+                extract(epoch from clock_timestamp()) AS sampled_at
+            FROM {schema}.pg_stat_statements
+        """).format(
+            column=psycopg2.sql.Identifier(statements['time_column']),
+            schema=psycopg2.sql.Identifier(statements['schema_name'])
+        ))
+        row = cursor.fetchone()
+        cpu_usage = cpu_tracker.observe(float(row['total_time']), float(row['sampled_at']))
+    
+    if cpu_usage is None:
+        # Ohne pg_stat_statements oder bei der ersten Messung: Anteil aktiver Verbindungen
+        cursor.execute("""
+            SELECT 
+                COALESCE(
+                    (SELECT COUNT(*) FROM pg_stat_activity WHERE state = 'active') / 
+                    (SELECT setting::float FROM pg_settings WHERE name = 'max_connections') * 100,
+                    0
+                ) as cpu_usage
+        """)
+        cpu_usage = cursor.fetchone()['cpu_usage']
+    
+    metrics.append({"name": "cpu_usage", "value": cpu_usage, "timestamp": datetime.now().isoformat()})
+    
+    # Speichernutzung - Echte Daten
+    cursor.execute("""
+        SELECT 
+            COALESCE(
+                (SELECT sum(pg_total_relation_size(c.oid))
+                 FROM pg_class c
+                 LEFT JOIN pg_namespace n ON n.oid = c.relnamespace
+                 WHERE c.relkind IN ('r','i')
+                 AND n.nspname NOT IN ('pg_catalog', 'information_schema')) /
+                (SELECT pg_database_size(current_database())) * 100,
+                0
+            ) as memory_usage
+    """)
+    
+    memory_usage = cursor.fetchone()['memory_usage']
+    metrics.append({"name": "memory_usage", "value": memory_usage, "timestamp": datetime.now().isoformat()})
+    
+    # Aktive Verbindungen - Echte Daten
+    cursor.execute("""
+        SELECT COUNT(*)::float as active_connections
+        FROM pg_stat_activity 
+        WHERE state = 'active'
+    """)
+    
+    active_connections = cursor.fetchone()['active_connections']
+    metrics.append({"name": "active_connections", "value": active_connections, "timestamp": datetime.now().isoformat()})
+    
+    return metrics
+
+# Fingerprint: Literale, Zahlen und IN-Listen durch ? ersetzen, Leerraum normalisieren.
+# Auf die ersten 4096 Zeichen begrenzt, damit lange generierte Queries billig bleiben.
+QUERY_FINGERPRINT_SQL = r"""
+    md5(regexp_replace(regexp_replace(regexp_replace(regexp_replace(
+        lower(left(query, 4096)),
+        '''(?:[^'']|'''')*''', '?', 'g'),
+        '\m[0-9]+(\.[0-9]+)?\M', '?', 'g'),
+        '\(\s*\?(\s*,\s*\?)*\s*\)', '(?)', 'g'),
+        '\s+', ' ', 'g'))
+"""
+
+# Aktive Sitzungen mit serverseitigen Filtern; die eigene Sitzung wird über
+# pg_backend_pid() statt über den Query-Text ausgeschlossen
+ACTIVE_SESSIONS_SQL = f"""
+    WITH sessions AS (
+        SELECT
+            pid, usename, application_name, client_addr, state,
+            wait_event_type, wait_event, query_start, query,
+            EXTRACT(EPOCH FROM (now() - query_start)) AS duration,
+            {QUERY_FINGERPRINT_SQL} AS fingerprint
+        FROM pg_stat_activity
+        WHERE state = 'active'
+          AND pid <> pg_backend_pid()
+          AND query_start IS NOT NULL
+          AND (%(user)s::text IS NULL OR usename = %(user)s)
+          AND (%(application)s::text IS NULL OR application_name = %(application)s)
+          AND (%(min_duration)s::float IS NULL OR query_start <= now() - make_interval(secs => %(min_duration)s))
+          AND (%(wait_event)s::text IS NULL OR wait_event_type = %(wait_event)s OR wait_event = %(wait_event)s)
+    )
+"""
+
+def encode_query_cursor(query_start: datetime, pid: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([query_start.isoformat(), pid]).encode('utf-8')).decode('ascii')
+
+def decode_query_cursor(value: str) -> tuple:
+    try:
+        query_start, pid = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        return datetime.fromisoformat(query_start), int(pid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+
+def collect_active_queries(
+    cursor,
+    filters: Optional[dict] = None,
+    after: Optional[str] = None,
+    limit: int = 50,
+    text_limit: int = QUERY_TEXT_LIMIT
+) -> tuple:
+    """Eine Seite aktiver Queries (neueste zuerst) und der Cursor für die nächste Seite"""
+    params = {"user": None, "application": None, "min_duration": None, "wait_event": None, "fingerprint": None}
+    params.update(filters or {})
+    after_start, after_pid = decode_query_cursor(after) if after else (None, None)
+    params.update({
+        "after_start": after_start,
+        "after_pid": after_pid,
+        "limit": limit + 1,
+        "text_limit": text_limit
+    })
+    cursor.execute(ACTIVE_SESSIONS_SQL + """
+        SELECT
+            pid as query_id,
+            usename as user,
+            application_name,
+            client_addr,
+            state,
+            wait_event_type,
+            wait_event,
+            left(query, %(text_limit)s) AS query,
+            length(query) AS query_length,
+            length(query) > %(text_limit)s AS query_truncated,
+            fingerprint,
+            query_start,
+            duration
+        FROM sessions
+        WHERE (%(fingerprint)s::text IS NULL OR fingerprint = %(fingerprint)s)
+          AND (%(after_start)s::timestamptz IS NULL
+               OR (query_start, pid) < (%(after_start)s::timestamptz, %(after_pid)s::integer))
+        ORDER BY query_start DESC, pid DESC
+        LIMIT %(limit)s
+    """, params)
+    
+    rows = [dict(query) for query in cursor.fetchall()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_query_cursor(rows[-1]['query_start'], rows[-1]['query_id'])
+    return rows, next_cursor
+
+def collect_cluster_nodes(cursor) -> List[dict]:
+    cursor.execute("SELECT to_regclass('management_ui.cluster_nodes') IS NOT NULL AS exists")
+    if not cursor.fetchone()['exists']:
+        return []
+    
+    cursor.execute("""
+        SELECT 
+            node_id,
+            hostname,
+            port,
+            role,
+            status,
+            last_heartbeat
+        FROM management_ui.cluster_nodes
+        ORDER BY role, hostname
+    """)
+    
+    return [dict(node) for node in cursor.fetchall()]
+
+# Citus-weite Query-Sicht
+# citus_stat_activity fragt alle Knoten parallel ab; Fragmente auf Workern tragen
+# die global_pid der auslösenden Sitzung und lassen sich darüber zusammenführen.
+# Die eigene Abfrage (und ihre Fragmente) wird über citus_backend_gpid() ausgeschlossen.
+CLUSTER_ACTIVITY_SQL = """
+    WITH activity AS (
+        SELECT
+            a.global_pid, a.nodeid, n.nodename, n.nodeport, a.pid, a.is_worker_query,
+            a.usename, a.application_name, a.state, a.wait_event_type, a.wait_event, a.query_start,
+            EXTRACT(EPOCH FROM (now() - a.query_start)) AS duration,
+            left(a.query, %(text_limit)s) AS query,
+            length(a.query) AS query_length
+        FROM citus_stat_activity a
+        LEFT JOIN pg_dist_node n ON n.nodeid = a.nodeid
+        WHERE a.state = 'active'
+          AND a.global_pid IS NOT NULL
+          AND a.global_pid <> citus_backend_gpid()
+    ),
+    roots AS (
+        SELECT global_pid
+        FROM activity
+        WHERE NOT is_worker_query
+          AND (%(user)s::text IS NULL OR usename = %(user)s)
+          AND (%(application)s::text IS NULL OR application_name = %(application)s)
+          AND (%(min_duration)s::float IS NULL OR duration >= %(min_duration)s)
+        ORDER BY duration DESC
+        LIMIT %(limit)s
+    )
+    SELECT activity.*
+    FROM activity
+    JOIN roots USING (global_pid)
+    ORDER BY activity.global_pid, activity.is_worker_query, activity.nodeid, activity.pid
+"""
+
+# Citus kodiert die global_pid als nodeid * 10^10 + pid
+CITUS_GPID_MULTIPLIER = 10000000000
+
+def citus_activity_available(cursor) -> bool:
+    cursor.execute("""
+        SELECT to_regclass('citus_stat_activity') IS NOT NULL
+           AND to_regprocedure('citus_backend_gpid()') IS NOT NULL AS available
+    """)
+    return cursor.fetchone()['available']
+
+def merge_cluster_activity(rows: List[dict]) -> List[dict]:
+    """Fasst Koordinator- und Worker-Zeilen je global_pid zu einer verteilten Query zusammen"""
+    queries = OrderedDict()
+    for row in rows:
+        entry = queries.get(row['global_pid'])
+        if entry is None:
+            entry = queries[row['global_pid']] = {
+                "global_pid": row['global_pid'],
+                "user": row['usename'],
+                "application_name": row['application_name'],
+                "query": row['query'],
+                "query_length": row['query_length'],
+                "query_start": row['query_start'],
+                "duration": row['duration'],
+                "nodes": [],
+                "fragments": []
+            }
+        fragment = {
+            "nodeid": row['nodeid'],
+            "nodename": row['nodename'],
+            "nodeport": row['nodeport'],
+            "pid": row['pid'],
+            "is_worker_query": row['is_worker_query'],
+            "state": row['state'],
+            "wait_event_type": row['wait_event_type'],
+            "wait_event": row['wait_event'],
+            "duration": row['duration'],
+            "query": row['query']
+        }
+        entry['fragments'].append(fragment)
+        if row['nodename'] not in entry['nodes']:
+            entry['nodes'].append(row['nodename'])
+    
+    result = list(queries.values())
+    for entry in result:
+        # Auslösende Sitzung zuerst, danach die Worker-Fragmente nach Laufzeit,
+        # damit der hängende Shard-Task sofort sichtbar ist
+        entry['fragments'].sort(key=lambda fragment: (fragment['is_worker_query'], -(fragment['duration'] or 0)))
+        entry['waiting_fragments'] = sum(1 for fragment in entry['fragments'] if fragment['wait_event_type'])
+    result.sort(key=lambda entry: -(entry['duration'] or 0))
+    return result
+
+class LiveMetricsSampler:
+    """Gemeinsame Sampling-Schleife für alle Live-Abonnenten
+    
+    Der Sampler läuft nur, solange es Abonnenten gibt. Jeder Durchlauf fragt
+    Metriken, aktive Queries und Cluster-Knoten einmal ab und verteilt nur die
+    Änderungen gegenüber dem vorherigen Zustand. Neue Abonnenten erhalten zuerst
+    den vollständigen Zustand als Snapshot.
+    """
+    
+    # Kanal -> (Schlüsselfeld, Felder, die bei jedem Sample wechseln und nicht verglichen werden)
+    CHANNELS = {
+        "metrics": ("name", ("timestamp",)),
+        "queries": ("query_id", ("duration",)),
+        "nodes": ("node_id", ()),
+    }
+    
+    def __init__(self, interval: float, queue_size: int):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.state = {}
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.loop = None
+        self.stop_event = None
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.loop = asyncio.get_running_loop()
+            self.subscribers.add(queue)
+            if self.state:
+                queue.put_nowait(("snapshot", self._encode(self.state)))
+            if self.stop_event is None:
+                self.stop_event = threading.Event()
+                threading.Thread(
+                    target=self._run, args=(self.stop_event,), name="live-metrics-sampler", daemon=True
+                ).start()
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self.lock:
+            self.subscribers.discard(queue)
+            if not self.subscribers and self.stop_event is not None:
+                self.stop_event.set()
+                self.stop_event = None
+                self.state = {}
+    
+    def stop(self):
+        with self.lock:
+            if self.stop_event is not None:
+                self.stop_event.set()
+                self.stop_event = None
+    
+    def sample(self) -> dict:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                return {
+                    "metrics": collect_system_metrics(cursor),
+                    "queries": collect_active_queries(cursor)[0],
+                    "nodes": collect_cluster_nodes(cursor),
+                }
+    
+    def _encode(self, channels: dict) -> str:
+        payload = {
+            "timestamp": datetime.now().isoformat(),
+            "channels": {name: {"upsert": list(items.values()), "remove": []} for name, items in channels.items()}
+        }
+        return json.dumps(payload, default=str)
+    
+    def _diff(self, sample: dict) -> Optional[dict]:
+        """Übernimmt das Sample in den Zustand und liefert die Änderungen je Kanal"""
+        changes = {}
+        for name, rows in sample.items():
+            key_field, volatile = self.CHANNELS[name]
+            old = self.state.get(name, {})
+            new = {str(row[key_field]): row for row in rows}
+            
+            def stable(row):
+                return {k: v for k, v in row.items() if k not in volatile}
+            
+            upsert = [row for key, row in new.items() if key not in old or stable(old[key]) != stable(row)]
+            remove = [key for key in old if key not in new]
+            self.state[name] = new
+            if upsert or remove:
+                changes[name] = {"upsert": upsert, "remove": remove}
+        return changes or None
+    
+    def _run(self, stop_event: threading.Event):
+        while not stop_event.is_set():
+            try:
+                sample = self.sample()
+            except Exception as e:
+                logger.warning("Live-Metriken konnten nicht abgefragt werden: %s", e)
+            else:
+                with self.lock:
+                    if stop_event.is_set():
+                        break
+                    changes = self._diff(sample)
+                    subscribers = list(self.subscribers)
+                    loop = self.loop
+                if changes and subscribers:
+                    # Einmal serialisieren, an alle Abonnenten verteilen
+                    payload = json.dumps({"timestamp": datetime.now().isoformat(), "channels": changes}, default=str)
+                    for queue in subscribers:
+                        loop.call_soon_threadsafe(self._deliver, queue, ("delta", payload))
+            stop_event.wait(self.interval)
+    
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, item):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Ein Client, der nicht hinterherkommt, wird getrennt statt Deltas zu verlieren
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+live_sampler = LiveMetricsSampler(LIVE_SAMPLE_INTERVAL, LIVE_QUEUE_SIZE)
+
+# Metrik-Historie
+# Die Verläufe liegen in management_ui.metric_history, damit alle Uvicorn-Worker
+# dieselben Reihen sehen und ein Neustart keine Lücke hinterlässt. Je Auflösung
+# wird pro Bucket Summe, Anzahl, Minimum und Maximum fortgeschrieben.
+class MetricHistory:
+    """Metrikverläufe mit Rollups auf 1m/5m/1h in einer gemeinsamen Tabelle"""
+    
+    def __init__(self, raw_interval: float):
+        self.raw_interval = raw_interval
+        # Auflösung -> (Schrittweite in Sekunden, Aufbewahrung in Sekunden)
+        self.resolutions = OrderedDict([
+            ("raw", (0, 3600)),           # 1 Stunde
+            ("1m", (60, 86400)),          # 24 Stunden
+            ("5m", (300, 7 * 86400)),     # 7 Tage
+            ("1h", (3600, 30 * 86400)),   # 30 Tage
+        ])
+    
+    def record(self, cursor, samples: Dict[str, float], timestamp: float):
+        rows = []
+        for name, value in samples.items():
+            for resolution, (step, _) in self.resolutions.items():
+                bucket = timestamp - timestamp % step if step else timestamp
+                rows.append((name, resolution, bucket, value, value, value))
+        if not rows:
+            return
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO management_ui.metric_history AS h
+                (metric, resolution, bucket, total, samples, min_value, max_value)
+            VALUES %s
+            ON CONFLICT (metric, resolution, bucket) DO UPDATE SET
+                total = h.total + EXCLUDED.total,
+                samples = h.samples + 1,
+                min_value = LEAST(h.min_value, EXCLUDED.min_value),
+                max_value = GREATEST(h.max_value, EXCLUDED.max_value)
+        """, rows, template="(%s, %s, to_timestamp(%s), %s, 1, %s, %s)")
+    
+    def prune(self, cursor):
+        """Löscht Punkte, die älter als die Aufbewahrung ihrer Auflösung sind"""
+        for resolution, (_, retention) in self.resolutions.items():
+            cursor.execute("""
+                DELETE FROM management_ui.metric_history
+                WHERE resolution = %s AND bucket < now() - make_interval(secs => %s)
+            """, (resolution, retention))
+    
+    def metric_names(self, cursor) -> List[str]:
+        # Die gröbste Auflösung enthält jede Metrik des Aufbewahrungszeitraums
+        cursor.execute("""
+            SELECT DISTINCT metric FROM management_ui.metric_history
+            WHERE resolution = '1h'
+            ORDER BY metric
+        """)
+        return [row['metric'] for row in cursor.fetchall()]
+    
+    def choose_resolution(self, start: float, end: float, max_points: int) -> str:
+        """Feinste Auflösung, die den Zeitraum noch aufbewahrt und höchstens max_points liefert"""
+        now = time.time()
+        for resolution, (step, retention) in self.resolutions.items():
+            expected = (end - start) / (step or self.raw_interval)
+            # Ein Intervall Spielraum, damit "letzte Stunde" noch Rohwerte liefert
+            if expected <= max_points and start + (step or self.raw_interval) >= now - retention:
+                return resolution
+        return "1h"
+    
+    def query(self, cursor, name: str, resolution: str, start: float, end: float) -> List[dict]:
+        cursor.execute("""
+            SELECT bucket, total / samples AS avg, min_value, max_value
+            FROM management_ui.metric_history
+            WHERE metric = %s AND resolution = %s
+              AND bucket BETWEEN to_timestamp(%s) AND to_timestamp(%s)
+            ORDER BY bucket
+        """, (name, resolution, start, end))
+        return [
+            {
+                "timestamp": row['bucket'].isoformat(),
+                "avg": row['avg'],
+                "min": row['min_value'],
+                "max": row['max_value']
+            }
+            for row in cursor.fetchall()
+        ]
+
+metric_history = MetricHistory(METRICS_HISTORY_INTERVAL)
+
+class MetricsRecorder:
+    """Schreibt die Systemmetriken periodisch in die Historie
+    
+    Es zeichnet nur ein Worker-Prozess auf: der, dessen Verbindung den
+    Advisory-Lock hält. Die übrigen versuchen es in jedem Intervall erneut
+    und übernehmen, sobald die Verbindung des bisherigen Halters endet.
+    """
+    
+    ADVISORY_LOCK_KEY = 20240102  # pg_try_advisory_lock-Schlüssel des aufzeichnenden Prozesses
+    PRUNE_INTERVAL = 300  # Sekunden zwischen Löschläufen
+    
+    def __init__(self, interval: float, history: MetricHistory):
+        self.interval = interval
+        self.history = history
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.conn = None
+        self.leader = False
+        self.last_prune = 0.0
+    
+    def _connect(self):
+        conn = psycopg2.connect(DATABASE_URL, application_name="exapg_metrics_recorder")
+        conn.autocommit = True
+        return conn
+    
+    def record_once(self) -> bool:
+        """Eine Messung aufzeichnen; False, wenn ein anderer Prozess aufzeichnet"""
+        if self.conn is None or self.conn.closed:
+            self.conn = self._connect()
+            self.leader = False
+        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            if not self.leader:
+                # Sitzungs-Lock: bleibt bis zum Ende der Verbindung gehalten
+                cursor.execute("SELECT pg_try_advisory_lock(%s) AS leader", (self.ADVISORY_LOCK_KEY,))
+                self.leader = cursor.fetchone()['leader']
+                if not self.leader:
+                    return False
+                logger.info("Metrik-Aufzeichnung übernommen von Prozess %d", os.getpid())
+            
+            metrics = collect_system_metrics(cursor)
+            now = time.time()
+            samples = {metric['name']: float(metric['value']) for metric in metrics if metric['value'] is not None}
+            self.history.record(cursor, samples, now)
+            if now - self.last_prune >= self.PRUNE_INTERVAL:
+                self.history.prune(cursor)
+                self.last_prune = now
+        return True
+    
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="metrics-recorder", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 5)
+            self.thread = None
+    
+    def _close(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+        self.leader = False
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.record_once()
+            except psycopg2.Error as e:
+                logger.warning("Metriken konnten nicht aufgezeichnet werden: %s", e)
+                self._close()
+            except Exception as e:
+                logger.warning("Metriken konnten nicht aufgezeichnet werden: %s", e)
+            self.stop_event.wait(self.interval)
+        self._close()
+
+metrics_recorder = MetricsRecorder(METRICS_HISTORY_INTERVAL, metric_history)
+
+# ETL-Warteschlange
+ETL_QUEUE_COLUMNS = """
+    q.queue_id, q.job_id, q.status, q.truncate_target, q.requested_by, q.enqueued_at, q.started_at,
+    q.finished_at, q.worker, q.backend_pid, q.etl_run_id, q.result, q.messages, q.error_message
+"""
+
+class EtlJobRunner:
+    """Arbeitet die persistente ETL-Warteschlange mit einer begrenzten Anzahl Threads ab
+    
+    Einträge werden per FOR UPDATE SKIP LOCKED beansprucht, sodass mehrere
+    API-Prozesse dieselbe Tabelle bedienen können. Ein Advisory-Lock pro Job
+    serialisiert das Beanspruchen, damit etl_jobs.parallel_workers auch über
+    Prozessgrenzen hinweg eingehalten wird. Jeder Thread hat eine eigene
+    Verbindung, damit lange Jobs den Request-Pool nicht belegen.
+    """
+    
+    ADVISORY_LOCK_CLASS = 20240101  # Namensraum für pg_try_advisory_xact_lock(int, int)
+    RECOVERY_INTERVAL = 60  # Sekunden zwischen Prüfungen auf verwaiste Läufe
+    
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.last_recovery = 0.0
+        self.recovery_lock = threading.Lock()
+    
+    def start(self):
+        if self.threads or self.workers <= 0:
+            return
+        self.stop_event.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"etl-runner-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def stop(self):
+        # Laufende Jobs werden nicht abgewartet; ihre Verbindung endet mit dem
+        # Prozess und die Wiederherstellung markiert sie als fehlgeschlagen
+        self.stop_event.set()
+        self.wakeup.set()
+        self.threads = []
+    
+    def notify(self):
+        self.wakeup.set()
+    
+    def _connect(self):
+        conn = psycopg2.connect(DATABASE_URL, application_name="exapg_etl_runner")
+        conn.autocommit = True
+        return conn
+    
+    def _run(self):
+        conn = None
+        while not self.stop_event.is_set():
+            try:
+                if conn is None or conn.closed:
+                    conn = self._connect()
+                self._recover_orphans(conn)
+                entry = self._claim(conn)
+                if entry is None:
+                    self.wakeup.wait(self.poll_interval)
+                    self.wakeup.clear()
+                    continue
+                self._execute(conn, entry)
+            except psycopg2.Error as e:
+                logger.warning("ETL-Runner: Datenbankfehler: %s", e)
+                if conn is not None:
+                    conn.close()
+                conn = None
+                self.stop_event.wait(self.poll_interval)
+        if conn is not None:
+            conn.close()
+    
+    def _recover_orphans(self, conn):
+        """Markiert laufende Einträge, deren Backend nicht mehr existiert, als fehlgeschlagen"""
+        with self.recovery_lock:
+            if time.monotonic() - self.last_recovery < self.RECOVERY_INTERVAL:
+                return
+            self.last_recovery = time.monotonic()
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE management_ui.etl_job_queue q
+                SET status = 'failed', finished_at = CURRENT_TIMESTAMP,
+                    error_message = 'Ausführende Verbindung wurde beendet'
+                WHERE q.status = 'running'
+                  AND NOT EXISTS (SELECT 1 FROM pg_stat_activity a WHERE a.pid = q.backend_pid)
+            """)
+            if cursor.rowcount:
+                logger.warning("ETL-Runner: %d verwaiste Läufe als fehlgeschlagen markiert", cursor.rowcount)
+    
+    def _claim(self, conn) -> Optional[dict]:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('etl_framework.etl_jobs') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return None
+        
+        conn.autocommit = False
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT q.queue_id, q.job_id, q.truncate_target,
+                           GREATEST(COALESCE(j.parallel_workers, 1), 1) AS max_parallel
+                    FROM management_ui.etl_job_queue q
+                    JOIN etl_framework.etl_jobs j ON j.job_id = q.job_id
+                    WHERE q.status = 'queued'
+                    ORDER BY q.queue_id
+                    LIMIT 20
+                    FOR UPDATE OF q SKIP LOCKED
+                """)
+                for candidate in cursor.fetchall():
+                    # Nur ein Prozess zählt gleichzeitig die laufenden Einträge eines Jobs
+                    cursor.execute(
+                        "SELECT pg_try_advisory_xact_lock(%s, %s) AS locked",
+                        (self.ADVISORY_LOCK_CLASS, candidate['job_id'])
+                    )
+                    if not cursor.fetchone()['locked']:
+                        continue
+                    cursor.execute("""
+                        SELECT COUNT(*) AS running FROM management_ui.etl_job_queue
+                        WHERE job_id = %s AND status = 'running'
+                    """, (candidate['job_id'],))
+                    if cursor.fetchone()['running'] >= candidate['max_parallel']:
+                        continue
+                    cursor.execute("""
+                        UPDATE management_ui.etl_job_queue
+                        SET status = 'running', started_at = CURRENT_TIMESTAMP,
+                            worker = %s, backend_pid = pg_backend_pid()
+                        WHERE queue_id = %s
+                    """, (self.worker_name, candidate['queue_id']))
+                    conn.commit()
+                    return dict(candidate)
+            conn.rollback()
+            return None
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
+    
+    def _execute(self, conn, entry: dict):
+        queue_id = entry['queue_id']
+        logger.info("ETL-Runner: starte Job %s (Eintrag %s)", entry['job_id'], queue_id)
+        del conn.notices[:]
+        status = 'succeeded'
+        result = None
+        error_message = None
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_proc p 
+                        JOIN pg_namespace n ON p.pronamespace = n.oid 
+                        WHERE n.nspname = 'etl_framework' AND p.proname = 'run_etl_job'
+                    )
+                """)
+                if cursor.fetchone()[0]:
+                    cursor.execute(
+                        "SELECT etl_framework.run_etl_job(%s, %s)",
+                        (entry['job_id'], entry['truncate_target'])
+                    )
+                    result = cursor.fetchone()[0]
+                else:
+                    # Nur Lauf-Eintrag erstellen, wenn keine Funktion existiert
+                    cursor.execute("""
+                        INSERT INTO etl_framework.etl_job_runs (job_id, status, start_time, end_time, rows_processed)
+                        VALUES (%s, 'success', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 0)
+                        RETURNING run_id
+                    """, (entry['job_id'],))
+                    result = {"run_id": cursor.fetchone()[0], "job_id": entry['job_id'], "rows_processed": 0}
+        except psycopg2.extensions.QueryCanceledError as e:
+            status = 'cancelled'
+            error_message = str(e).strip()
+        except psycopg2.Error as e:
+            if conn.closed:
+                raise
+            status = 'failed'
+            error_message = str(e).strip()
+        
+        messages = [notice.strip() for notice in conn.notices]
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE management_ui.etl_job_queue
+                SET status = %s, finished_at = CURRENT_TIMESTAMP, result = %s, messages = %s,
+                    etl_run_id = %s, error_message = %s
+                WHERE queue_id = %s
+            """, (
+                status,
+                psycopg2.extras.Json(result) if result is not None else None,
+                psycopg2.extras.Json(messages),
+                (result or {}).get('run_id'),
+                error_message,
+                queue_id
+            ))
+        logger.info("ETL-Runner: Eintrag %s beendet mit Status %s", queue_id, status)
+
+etl_runner = EtlJobRunner(ETL_RUNNER_WORKERS, ETL_RUNNER_POLL_INTERVAL)
+
+def fetch_queue_entry(cursor, queue_id: int) -> Optional[dict]:
+    """Queue-Eintrag mit Laufzeitinformationen des ausführenden Backends"""
+    cursor.execute(f"""
+        SELECT {ETL_QUEUE_COLUMNS},
+            EXTRACT(EPOCH FROM (COALESCE(q.finished_at, now()) - q.started_at)) AS elapsed_seconds,
+            a.state AS backend_state,
+            a.wait_event_type,
+            a.wait_event
+        FROM management_ui.etl_job_queue q
+        LEFT JOIN pg_stat_activity a ON q.status = 'running' AND a.pid = q.backend_pid
+        WHERE q.queue_id = %s
+    """, (queue_id,))
+    entry = cursor.fetchone()
+    return dict(entry) if entry else None
 
 # API Endpunkte
 
 @app.on_event("startup")
 async def startup_event():
-    init_database()
+    # Blockierende psycopg2-Aufrufe laufen in synchronen Endpunkten im Threadpool
+    # von FastAPI; dessen Größe wird hier begrenzt
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_THREADPOOL_SIZE
+    await anyio.to_thread.run_sync(init_database)
+    dashboard_collector.start()
+    metrics_recorder.start()
+    etl_runner.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    dashboard_collector.stop()
+    live_sampler.stop()
+    metrics_recorder.stop()
+    etl_runner.stop()
+    close_db_pool()
 
 @app.get("/")
 async def root():
@@ -272,57 +1378,36 @@ async def root():
 
 # Authentifizierung
 @app.post("/api/auth/login", response_model=Token)
-async def login(user_login: UserLogin):
+def login(user_login: UserLogin):
     try:
-        print(f"Login-Versuch für Benutzer: {user_login.username}")
+        logger.debug("Login-Versuch für Benutzer: %s", user_login.username)
         
         # Standard-Demo-Anmeldeinformationen
         if user_login.username == "admin" and user_login.password == "admin123":
-            print("Demo-Admin-Benutzer erkannt, generiere Token...")
+            logger.debug("Demo-Admin-Benutzer erkannt, generiere Token")
             access_token = create_access_token(data={"sub": user_login.username})
-            print(f"Token generiert: {access_token[:10]}...")
             return {"access_token": access_token, "token_type": "bearer"}
-
-        # Versuche, den Benutzer in der Datenbank zu finden
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                # Prüfe, ob das Schema und die Tabelle existieren
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM information_schema.tables 
-                        WHERE table_schema = 'management_ui' AND table_name = 'users'
-                    )
-                """)
-                
-                if not cursor.fetchone()['exists']:
-                    print("Users-Tabelle nicht gefunden, erstelle Schema und Tabelle...")
-                    cursor.execute("CREATE SCHEMA IF NOT EXISTS management_ui")
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS management_ui.users (
-                            username VARCHAR(50) PRIMARY KEY,
-                            password_hash VARCHAR(255) NOT NULL,
-                            email VARCHAR(255),
-                            is_admin BOOLEAN DEFAULT FALSE,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            last_login TIMESTAMP
+        
+        # Versuche, den Benutzer in der Datenbank zu finden; die Tabelle legt init_database beim Start an
+        if users_table_ready:
+            with get_db_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.execute("SELECT * FROM management_ui.users WHERE username = %s", (user_login.username,))
+                    user = cursor.fetchone()
+                    
+                    if user and verify_password(user_login.password, user['password_hash']):
+                        logger.debug("Benutzer %s authentifiziert, generiere Token", user_login.username)
+                        # Update last login
+                        cursor.execute(
+                            "UPDATE management_ui.users SET last_login = CURRENT_TIMESTAMP WHERE username = %s",
+                            (user_login.username,)
                         )
-                    """)
-                    conn.commit()
-                
-                cursor.execute("SELECT * FROM management_ui.users WHERE username = %s", (user_login.username,))
-                user = cursor.fetchone()
-                
-                if user and verify_password(user_login.password, user['password_hash']):
-                    print(f"Benutzer {user_login.username} authentifiziert, generiere Token...")
-                    # Update last login
-                    cursor.execute(
-                        "UPDATE management_ui.users SET last_login = CURRENT_TIMESTAMP WHERE username = %s",
-                        (user_login.username,)
-                    )
-                    access_token = create_access_token(data={"sub": user_login.username})
-                    return {"access_token": access_token, "token_type": "bearer"}
-                
-                print(f"Authentifizierung fehlgeschlagen für {user_login.username}")
+                        access_token = create_access_token(data={"sub": user_login.username})
+                        return {"access_token": access_token, "token_type": "bearer"}
+        else:
+            logger.warning("Benutzertabelle nicht initialisiert, nur Demo-Anmeldung möglich")
+        
+        logger.info("Authentifizierung fehlgeschlagen für %s", user_login.username)
         
         # Wenn wir hier angelangt sind, hat die Authentifizierung fehlgeschlagen
         raise HTTPException(
@@ -330,8 +1415,10 @@ async def login(user_login: UserLogin):
             detail="Ungültiger Benutzername oder Passwort",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Fehler bei der Anmeldung: {str(e)}")
+        logger.error("Fehler bei der Anmeldung: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Interner Serverfehler bei der Anmeldung",
@@ -348,7 +1435,7 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 
 # Benutzer-Management
 @app.get("/api/users", response_model=List[User])
-async def get_users(current_user: dict = Depends(get_admin_user)):
+def get_users(current_user: dict = Depends(get_admin_user)):
     with get_db_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
             cursor.execute("SELECT username, email, is_admin FROM management_ui.users ORDER BY username")
@@ -356,7 +1443,7 @@ async def get_users(current_user: dict = Depends(get_admin_user)):
             return [User(**user) for user in users]
 
 @app.post("/api/users", response_model=User)
-async def create_user(user: UserCreate, current_user: dict = Depends(get_admin_user)):
+def create_user(user: UserCreate, current_user: dict = Depends(get_admin_user)):
     with get_db_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
             # Prüfe, ob Benutzer bereits existiert
@@ -373,180 +1460,74 @@ async def create_user(user: UserCreate, current_user: dict = Depends(get_admin_u
             """, (user.username, password_hash, user.email, user.is_admin))
             
             new_user = cursor.fetchone()
+            # Wirkt nur in diesem Worker-Prozess; die übrigen sehen die Änderung
+            # spätestens nach PRINCIPAL_CACHE_TTL Sekunden
+            principal_cache.invalidate(user.username)
             return User(**new_user)
 
 # Dashboard und Metriken
 @app.get("/api/dashboard/overview")
-async def get_dashboard_overview(current_user: dict = Depends(get_current_user)):
+def get_dashboard_overview(request: Request, current_user: dict = Depends(get_current_user)):
     try:
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                print("Abfrage aktiver Verbindungen...")
-                cursor.execute("""
-                    SELECT 
-                        COUNT(*) as total_connections
-                    FROM pg_stat_activity 
-                    WHERE state = 'active'
-                """)
-                active_connections = cursor.fetchone()['total_connections']
-                print(f"Aktive Verbindungen: {active_connections}")
-                
-                print("Abfrage Datenbankgröße...")
-                cursor.execute("""
-                    SELECT pg_size_pretty(pg_database_size(current_database())) as database_size
-                """)
-                db_size = cursor.fetchone()['database_size']
-                print(f"Datenbankgröße: {db_size}")
-                
-                # Echte ETL-Job-Statistiken
-                etl_stats = {'total_jobs': 0, 'active_jobs': 0}
-                # Prüfen und ggf. erstellen des ETL-Schemas und der ETL-Jobs-Tabelle
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM information_schema.schemata 
-                        WHERE schema_name = 'etl_framework'
-                    )
-                """)
-                
-                if cursor.fetchone()['exists']:
-                    cursor.execute("""
-                        SELECT EXISTS (
-                            SELECT 1 FROM information_schema.tables 
-                            WHERE table_schema = 'etl_framework' AND table_name = 'etl_jobs'
-                        )
-                    """)
-                    
-                    if cursor.fetchone()['exists']:
-                        # ETL-Job-Statistiken abfragen
-                        cursor.execute("""
-                            SELECT 
-                                COUNT(*) as total_jobs,
-                                COUNT(CASE WHEN enabled THEN 1 END) as active_jobs
-                            FROM etl_framework.etl_jobs
-                        """)
-                        etl_stats = cursor.fetchone()
-                
-                # Echte Cluster-Knoten-Statistiken
-                cluster_stats = {'total_nodes': 0, 'online_nodes': 0}
-                # Prüfen und ggf. erstellen des Management-UI-Schemas und der Cluster-Nodes-Tabelle
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM information_schema.schemata 
-                        WHERE schema_name = 'management_ui'
-                    )
-                """)
-                
-                if cursor.fetchone()['exists']:
-                    cursor.execute("""
-                        SELECT EXISTS (
-                            SELECT 1 FROM information_schema.tables 
-                            WHERE table_schema = 'management_ui' AND table_name = 'cluster_nodes'
-                        )
-                    """)
-                    
-                    if cursor.fetchone()['exists']:
-                        # Cluster-Knoten-Statistiken abfragen
-                        cursor.execute("""
-                            SELECT 
-                                COUNT(*) as total_nodes,
-                                COUNT(CASE WHEN status = 'online' THEN 1 END) as online_nodes
-                            FROM management_ui.cluster_nodes
-                        """)
-                        cluster_stats = cursor.fetchone()
-                
-                response_data = {
-                    "active_connections": active_connections,
-                    "total_etl_jobs": etl_stats['total_jobs'],
-                    "active_etl_jobs": etl_stats['active_jobs'],
-                    "total_nodes": cluster_stats['total_nodes'],
-                    "online_nodes": cluster_stats['online_nodes'],
-                    "database_size": db_size,
-                    "cluster_health": "healthy" if cluster_stats['online_nodes'] == cluster_stats['total_nodes'] else "warning"
-                }
-                
-                print(f"Dashboard Overview Antwort: {response_data}")
-                return response_data
+        snapshot, etag = dashboard_collector.get()
+        return snapshot_response(request, snapshot, etag, DASHBOARD_REFRESH_INTERVAL)
     except Exception as e:
-        print(f"Fehler bei Dashboard Overview: {str(e)}")
+        logger.error("Fehler bei Dashboard Overview: %s", e)
         raise HTTPException(status_code=500, detail=f"Fehler bei Dashboard-Übersicht: {str(e)}")
 
 @app.get("/api/dashboard/metrics")
-async def get_system_metrics(current_user: dict = Depends(get_current_user)):
+def get_system_metrics(current_user: dict = Depends(get_current_user)):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                # Prüfe, ob pg_stat_statements existiert
-                print("Prüfe pg_stat_statements Erweiterung...")
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'
-                    ) AS extension_exists
-                """)
-                
-                pg_stat_statements_exists = cursor.fetchone()['extension_exists']
-                print(f"pg_stat_statements existiert: {pg_stat_statements_exists}")
-                
-                metrics = []
-                
-                # CPU-Auslastung - Echte Daten wenn möglich
-                if pg_stat_statements_exists:
-                    cursor.execute("""
-                        SELECT 
-                            COALESCE(
-                                (SELECT sum(total_time) FROM pg_stat_statements) / 
-                                (SELECT extract(epoch from (now() - pg_postmaster_start_time()))), 
-                                0
-                            ) * 100 as cpu_usage
-                    """)
-                else:
-                    cursor.execute("""
-                        SELECT 
-                            COALESCE(
-                                (SELECT COUNT(*) FROM pg_stat_activity WHERE state = 'active') / 
-                                (SELECT setting::float FROM pg_settings WHERE name = 'max_connections') * 100,
-                                0
-                            ) as cpu_usage
-                    """)
-                
-                cpu_usage = cursor.fetchone()['cpu_usage']
-                metrics.append({"name": "cpu_usage", "value": cpu_usage, "timestamp": datetime.now().isoformat()})
-                
-                # Speichernutzung - Echte Daten
-                cursor.execute("""
-                    SELECT 
-                        COALESCE(
-                            (SELECT sum(pg_total_relation_size(c.oid))
-                             FROM pg_class c
-                             LEFT JOIN pg_namespace n ON n.oid = c.relnamespace
-                             WHERE c.relkind IN ('r','i')
-                             AND n.nspname NOT IN ('pg_catalog', 'information_schema')) /
-                            (SELECT pg_database_size(current_database())) * 100,
-                            0
-                        ) as memory_usage
-                """)
-                
-                memory_usage = cursor.fetchone()['memory_usage']
-                metrics.append({"name": "memory_usage", "value": memory_usage, "timestamp": datetime.now().isoformat()})
-                
-                # Aktive Verbindungen - Echte Daten
-                cursor.execute("""
-                    SELECT COUNT(*)::float as active_connections
-                    FROM pg_stat_activity 
-                    WHERE state = 'active'
-                """)
-                
-                active_connections = cursor.fetchone()['active_connections']
-                metrics.append({"name": "active_connections", "value": active_connections, "timestamp": datetime.now().isoformat()})
-                
-                print(f"Metriken Ergebnis: {metrics}")
+                metrics = collect_system_metrics(cursor)
+                logger.debug("Metriken Ergebnis: %s", metrics)
                 return metrics
     except Exception as e:
-        print(f"Fehler bei System-Metriken: {str(e)}")
+        logger.error("Fehler bei System-Metriken: %s", e)
         raise HTTPException(status_code=500, detail=f"Fehler bei System-Metriken: {str(e)}")
 
+@app.get("/api/metrics/history")
+def get_metric_history(
+    metric: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = "auto",
+    current_user: dict = Depends(get_current_user)
+):
+    """Verlauf einer oder aller Metriken im Zeitraum [start, end] (Standard: letzte Stunde)"""
+    end_ts = end.timestamp() if end else time.time()
+    start_ts = start.timestamp() if start else end_ts - 3600
+    if start_ts > end_ts:
+        raise HTTPException(status_code=400, detail="start muss vor end liegen")
+    if resolution != "auto" and resolution not in metric_history.resolutions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unbekannte Auflösung {resolution}, erlaubt: auto, {', '.join(metric_history.resolutions)}"
+        )
+    
+    chosen = resolution
+    if chosen == "auto":
+        chosen = metric_history.choose_resolution(start_ts, end_ts, METRICS_HISTORY_MAX_POINTS)
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                names = [metric] if metric else metric_history.metric_names(cursor)
+                return [
+                    {
+                        "metric": name,
+                        "resolution": chosen,
+                        "points": metric_history.query(cursor, name, chosen, start_ts, end_ts)
+                    }
+                    for name in names
+                ]
+    except Exception as e:
+        logger.error("Fehler beim Abrufen der Metrik-Historie: %s", e)
+        raise HTTPException(status_code=500, detail="Fehler beim Abrufen der Metrik-Historie")
+
 # ETL-Management
 @app.get("/api/etl/jobs")
-async def get_etl_jobs(current_user: dict = Depends(get_current_user)):
+def get_etl_jobs(current_user: dict = Depends(get_current_user)):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
@@ -606,121 +1587,238 @@ async def get_etl_jobs(current_user: dict = Depends(get_current_user)):
                 
                 jobs = cursor.fetchall()
                 result = [dict(job) for job in jobs]
-                print(f"ETL Jobs gefunden: {len(result)}")
+                logger.debug("ETL-Jobs gefunden: %d", len(result))
                 return result
     except Exception as e:
-        print(f"Fehler bei ETL Jobs: {str(e)}")
+        logger.error("Fehler beim Abrufen der ETL-Jobs: %s", e)
         raise HTTPException(status_code=500, detail="Fehler beim Abrufen der ETL-Jobs")
 
-@app.post("/api/etl/jobs/{job_id}/run")
-async def run_etl_job(job_id: int, current_user: dict = Depends(get_current_user)):
+@app.post("/api/etl/jobs/{job_id}/run", status_code=202)
+def run_etl_job(job_id: int, truncate_target: bool = False, current_user: dict = Depends(get_current_user)):
+    """Stellt einen ETL-Lauf in die Warteschlange und kehrt sofort zurück"""
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
                 # Prüfen, ob der Job existiert
-                cursor.execute("SELECT EXISTS (SELECT 1 FROM etl_framework.etl_jobs WHERE job_id = %s)", (job_id,))
+                cursor.execute("""
+                    SELECT to_regclass('etl_framework.etl_jobs') IS NOT NULL
+                       AND EXISTS (SELECT 1 FROM etl_framework.etl_jobs WHERE job_id = %s) AS exists
+                """, (job_id,))
                 
                 if not cursor.fetchone()['exists']:
                     raise HTTPException(status_code=404, detail=f"ETL-Job mit ID {job_id} nicht gefunden")
                 
-                # Echten ETL-Job ausführen, falls eine entsprechende Funktion existiert
                 cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM pg_proc p 
-                        JOIN pg_namespace n ON p.pronamespace = n.oid 
-                        WHERE n.nspname = 'etl_framework' AND p.proname = 'run_etl_job'
-                    )
-                """)
-                
-                if cursor.fetchone()['exists']:
-                    # Echten ETL-Job starten
-                    cursor.execute("SELECT etl_framework.run_etl_job(%s)", (job_id,))
-                    result = cursor.fetchone()
-                    
-                    # Erfolgreichen Lauf eintragen
-                    run_id = None
-                    cursor.execute("""
-                        INSERT INTO etl_framework.etl_job_runs (job_id, status, start_time, end_time, rows_processed)
-                        VALUES (%s, 'success', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 0)
-                        RETURNING run_id
-                    """, (job_id,))
-                    run_id = cursor.fetchone()['run_id']
-                    conn.commit()
-                    
-                    return {
-                        "success": True,
-                        "message": f"ETL-Job {job_id} gestartet (Run ID: {run_id})",
-                        "job_id": job_id,
-                        "run_id": run_id
-                    }
-                else:
-                    # Nur Lauf-Eintrag erstellen, wenn keine Funktion existiert
-                    cursor.execute("""
-                        INSERT INTO etl_framework.etl_job_runs (job_id, status, start_time, end_time, rows_processed)
-                        VALUES (%s, 'success', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 0)
-                        RETURNING run_id
-                    """, (job_id,))
-                    run_id = cursor.fetchone()['run_id']
-                    conn.commit()
-                    
-                    return {
-                        "success": True,
-                        "message": f"ETL-Job-Lauf {run_id} protokolliert",
-                        "job_id": job_id,
-                        "run_id": run_id
-                    }
+                    INSERT INTO management_ui.etl_job_queue (job_id, truncate_target, requested_by)
+                    VALUES (%s, %s, %s)
+                    RETURNING queue_id
+                """, (job_id, truncate_target, current_user['username']))
+                queue_id = cursor.fetchone()['queue_id']
+        
+        etl_runner.notify()
+        return {
+            "success": True,
+            "message": f"ETL-Job {job_id} eingereiht (Queue-ID: {queue_id})",
+            "job_id": job_id,
+            "queue_id": queue_id,
+            "status": "queued"
+        }
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Fehler beim Starten des ETL-Jobs: {str(e)}")
+        logger.error("Fehler beim Einreihen des ETL-Jobs: %s", e)
         raise HTTPException(status_code=500, detail=f"Fehler beim Starten des ETL-Jobs: {str(e)}")
 
+@app.get("/api/etl/queue")
+def get_etl_queue(
+    status: Optional[str] = None,
+    job_id: Optional[int] = None,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT {ETL_QUEUE_COLUMNS}
+                    FROM management_ui.etl_job_queue q
+                    WHERE (%(status)s IS NULL OR q.status = %(status)s)
+                      AND (%(job_id)s IS NULL OR q.job_id = %(job_id)s)
+                    ORDER BY q.queue_id DESC
+                    LIMIT %(limit)s
+                """, {"status": status, "job_id": job_id, "limit": min(max(limit, 1), 1000)})
+                return [dict(entry) for entry in cursor.fetchall()]
+    except Exception as e:
+        logger.error("Fehler beim Abrufen der ETL-Warteschlange: %s", e)
+        raise HTTPException(status_code=500, detail="Fehler beim Abrufen der ETL-Warteschlange")
+
+@app.get("/api/etl/queue/{queue_id}")
+def get_etl_queue_entry(queue_id: int, current_user: dict = Depends(get_current_user)):
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            entry = fetch_queue_entry(cursor, queue_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Queue-Eintrag {queue_id} nicht gefunden")
+    return entry
+
+@app.get("/api/etl/queue/{queue_id}/events")
+async def stream_etl_queue_entry(queue_id: int, request: Request, current_user: dict = Depends(get_stream_user)):
+    """Fortschritt eines Laufs als Server-Sent Events; endet mit dem Abschluss des Laufs"""
+    
+    def load():
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                return fetch_queue_entry(cursor, queue_id)
+    
+    entry = await anyio.to_thread.run_sync(load)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Queue-Eintrag {queue_id} nicht gefunden")
+    
+    async def events(entry):
+        while True:
+            yield f"event: progress\ndata: {json.dumps(entry, default=str)}\n\n"
+            if entry['status'] not in ('queued', 'running') or await request.is_disconnected():
+                break
+            await asyncio.sleep(ETL_RUNNER_POLL_INTERVAL)
+            entry = await anyio.to_thread.run_sync(load)
+    
+    return StreamingResponse(
+        events(entry),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/etl/queue/{queue_id}/cancel")
+def cancel_etl_queue_entry(queue_id: int, current_user: dict = Depends(get_current_user)):
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            # Wartende Einträge direkt abbrechen, laufende über ihr Backend
+            cursor.execute("""
+                UPDATE management_ui.etl_job_queue
+                SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP
+                WHERE queue_id = %s AND status = 'queued'
+                RETURNING queue_id
+            """, (queue_id,))
+            if cursor.fetchone():
+                return {"success": True, "message": "Wartender Lauf abgebrochen"}
+            
+            cursor.execute("""
+                SELECT pg_cancel_backend(backend_pid) AS cancelled
+                FROM management_ui.etl_job_queue
+                WHERE queue_id = %s AND status = 'running'
+            """, (queue_id,))
+            row = cursor.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Kein wartender oder laufender Eintrag {queue_id}")
+    return {"success": row['cancelled'], "message": "Abbruch angefordert" if row['cancelled'] else "Fehler beim Abbrechen"}
+
 # Query-Monitoring
 @app.get("/api/queries/active")
-async def get_active_queries(current_user: dict = Depends(get_current_user)):
+def get_active_queries(
+    response: Response,
+    user: Optional[str] = None,
+    application: Optional[str] = None,
+    min_duration: Optional[float] = None,
+    wait_event: Optional[str] = None,
+    fingerprint: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    text_limit: int = QUERY_TEXT_LIMIT,
+    current_user: dict = Depends(get_current_user)
+):
+    """Seite aktiver Queries; der Cursor für die nächste Seite steht im Header X-Next-Cursor"""
+    filters = {
+        "user": user,
+        "application": application,
+        "min_duration": min_duration,
+        "wait_event": wait_event,
+        "fingerprint": fingerprint
+    }
+    limit = min(max(limit, 1), QUERY_PAGE_MAX)
+    text_limit = min(max(text_limit, 0), QUERY_TEXT_LIMIT)
     try:
         with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                print("Führe Abfrage für aktive Queries aus...")
-                cursor.execute("""
-                    SELECT 
-                        pid as query_id,
-                        usename as user,
-                        application_name,
-                        client_addr,
-                        state,
-                        query,
-                        query_start,
-                        EXTRACT(EPOCH FROM (now() - query_start)) as duration
-                    FROM pg_stat_activity 
-                    WHERE state = 'active' 
-                    AND query NOT LIKE '%pg_stat_activity%'
-                    ORDER BY query_start DESC
-                    LIMIT 50
-                """)
-                
-                queries = cursor.fetchall()
-                result = [dict(query) for query in queries]
-                print(f"Gefundene aktive Queries: {len(result)}")
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as db_cursor:
+                result, next_cursor = collect_active_queries(db_cursor, filters, cursor, limit, text_limit)
+                logger.debug("Gefundene aktive Queries: %d", len(result))
+                if next_cursor:
+                    response.headers["X-Next-Cursor"] = next_cursor
                 return result
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        print(f"Fehler bei Abfrage der aktiven Queries: {str(e)}")
+        logger.error("Fehler bei Abfrage der aktiven Queries: %s", e)
         raise HTTPException(status_code=500, detail="Fehler beim Abrufen der aktiven Queries")
 
+@app.get("/api/queries/active/groups")
+def get_active_query_groups(
+    user: Optional[str] = None,
+    application: Optional[str] = None,
+    min_duration: Optional[float] = None,
+    wait_event: Optional[str] = None,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user)
+):
+    """Aktive Queries nach Fingerprint gruppiert, größte Gruppen zuerst"""
+    params = {
+        "user": user,
+        "application": application,
+        "min_duration": min_duration,
+        "wait_event": wait_event,
+        "limit": min(max(limit, 1), QUERY_PAGE_MAX),
+        "text_limit": QUERY_TEXT_LIMIT
+    }
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                cursor.execute(ACTIVE_SESSIONS_SQL + """
+                    SELECT
+                        fingerprint,
+                        COUNT(*) AS sessions,
+                        array_agg(DISTINCT usename) AS users,
+                        array_agg(DISTINCT application_name) AS applications,
+                        MAX(duration) AS max_duration,
+                        AVG(duration) AS avg_duration,
+                        left(MIN(query), %(text_limit)s) AS sample_query
+                    FROM sessions
+                    GROUP BY fingerprint
+                    ORDER BY sessions DESC, max_duration DESC
+                    LIMIT %(limit)s
+                """, params)
+                return [dict(group) for group in cursor.fetchall()]
+    except Exception as e:
+        logger.error("Fehler beim Gruppieren der aktiven Queries: %s", e)
+        raise HTTPException(status_code=500, detail="Fehler beim Gruppieren der aktiven Queries")
+
+@app.get("/api/queries/{query_id}/text")
+def get_query_text(query_id: int, query_start: Optional[datetime] = None, current_user: dict = Depends(get_current_user)):
+    """Vollständiger Query-Text; mit query_start wird geprüft, dass die PID noch dieselbe Query ausführt"""
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT pid AS query_id, query_start, query
+                FROM pg_stat_activity
+                WHERE pid = %(pid)s
+                  AND (%(query_start)s::timestamptz IS NULL OR query_start = %(query_start)s::timestamptz)
+            """, {"pid": query_id, "query_start": query_start})
+            row = cursor.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Query mit ID {query_id} nicht (mehr) aktiv")
+    return dict(row)
+
 @app.post("/api/queries/{query_id}/cancel")
-async def cancel_query(query_id: int, current_user: dict = Depends(get_admin_user)):
+def cancel_query(query_id: int, current_user: dict = Depends(get_admin_user)):
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 # Prüfe, ob der Query-Prozess existiert
-                print(f"Prüfe Query-Prozess {query_id}...")
                 cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_stat_activity WHERE pid = %s)", (query_id,))
                 query_exists = cursor.fetchone()[0]
                 
                 if not query_exists:
                     raise HTTPException(status_code=404, detail=f"Query mit ID {query_id} nicht gefunden")
                 
-                print(f"Breche Query {query_id} ab...")
+                logger.info("Breche Query %d ab", query_id)
                 cursor.execute("SELECT pg_cancel_backend(%s)", (query_id,))
                 result = cursor.fetchone()[0]
                 
@@ -728,60 +1826,126 @@ async def cancel_query(query_id: int, current_user: dict = Depends(get_admin_use
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Fehler beim Abbrechen der Query: {str(e)}")
+        logger.error("Fehler beim Abbrechen der Query: %s", e)
         raise HTTPException(status_code=500, detail=f"Fehler beim Abbrechen der Query: {str(e)}")
 
 # Cluster-Management
 @app.get("/api/cluster/nodes")
-async def get_cluster_nodes(current_user: dict = Depends(get_current_user)):
+def get_cluster_nodes(current_user: dict = Depends(get_current_user)):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                # Prüfe, ob die Cluster-Nodes-Tabelle existiert
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM information_schema.schemata 
-                        WHERE schema_name = 'management_ui'
-                    )
-                """)
-                
-                if not cursor.fetchone()['exists']:
-                    return []
-                
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT 1 FROM information_schema.tables 
-                        WHERE table_schema = 'management_ui' AND table_name = 'cluster_nodes'
-                    )
-                """)
-                
-                if not cursor.fetchone()['exists']:
-                    return []
-                
-                # Abrufen der tatsächlichen Cluster-Knoten
-                cursor.execute("""
-                    SELECT 
-                        node_id,
-                        hostname,
-                        port,
-                        role,
-                        status,
-                        last_heartbeat
-                    FROM management_ui.cluster_nodes
-                    ORDER BY role, hostname
-                """)
-                
-                nodes = cursor.fetchall()
-                result = [dict(node) for node in nodes]
-                print(f"Cluster-Knoten gefunden: {len(result)}")
+                result = collect_cluster_nodes(cursor)
+                logger.debug("Cluster-Knoten gefunden: %d", len(result))
                 return result
     except Exception as e:
-        print(f"Fehler bei Cluster-Knoten: {str(e)}")
+        logger.error("Fehler bei Cluster-Knoten: %s", e)
         raise HTTPException(status_code=500, detail="Fehler beim Abrufen der Cluster-Knoten")
 
+@app.get("/api/cluster/queries/active")
+def get_cluster_active_queries(
+    user: Optional[str] = None,
+    application: Optional[str] = None,
+    min_duration: Optional[float] = None,
+    limit: int = 50,
+    current_user: dict = Depends(get_current_user)
+):
+    """Aktive verteilte Queries aller Citus-Knoten, zusammengeführt nach global_pid"""
+    params = {
+        "user": user,
+        "application": application,
+        "min_duration": min_duration,
+        "limit": min(max(limit, 1), QUERY_PAGE_MAX),
+        "text_limit": QUERY_TEXT_LIMIT
+    }
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                if not citus_activity_available(cursor):
+                    raise HTTPException(status_code=501, detail="citus_stat_activity nicht verfügbar (Citus 11+ erforderlich)")
+                cursor.execute(CLUSTER_ACTIVITY_SQL, params)
+                result = merge_cluster_activity([dict(row) for row in cursor.fetchall()])
+                logger.debug("Verteilte Queries gefunden: %d", len(result))
+                return result
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error("Fehler bei clusterweiter Query-Abfrage: %s", e)
+        raise HTTPException(status_code=500, detail=f"Fehler beim Abrufen der clusterweiten Queries: {str(e)}")
+
+@app.post("/api/cluster/queries/{global_pid}/cancel")
+def cancel_cluster_query(global_pid: int, current_user: dict = Depends(get_admin_user)):
+    """Bricht eine verteilte Query samt aller Fragmente auf den Workern ab"""
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                if not citus_activity_available(cursor):
+                    raise HTTPException(status_code=501, detail="citus_stat_activity nicht verfügbar (Citus 11+ erforderlich)")
+                # Jedes Backend über seine eigene globale PID abbrechen; pg_cancel_backend(bigint)
+                # leitet den Aufruf an den jeweiligen Knoten weiter. Fragmente zuerst, damit
+                # der Koordinator keine neuen Tasks mehr verteilt, bevor er selbst abbricht.
+                cursor.execute("""
+                    SELECT
+                        nodeid,
+                        pid,
+                        is_worker_query,
+                        pg_cancel_backend(nodeid::bigint * %(multiplier)s + pid) AS cancelled
+                    FROM (
+                        SELECT DISTINCT nodeid, pid, is_worker_query
+                        FROM citus_stat_activity
+                        WHERE global_pid = %(global_pid)s
+                          AND global_pid <> citus_backend_gpid()
+                        ORDER BY is_worker_query DESC, nodeid, pid
+                    ) backends
+                """, {"global_pid": global_pid, "multiplier": CITUS_GPID_MULTIPLIER})
+                backends = [dict(row) for row in cursor.fetchall()]
+        
+        if not backends:
+            raise HTTPException(status_code=404, detail=f"Verteilte Query {global_pid} nicht gefunden")
+        cancelled = sum(1 for backend in backends if backend['cancelled'])
+        return {
+            "success": cancelled > 0,
+            "message": f"Abbruch für {cancelled} von {len(backends)} Backends angefordert",
+            "global_pid": global_pid,
+            "backends": backends
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error("Fehler beim Abbrechen der verteilten Query: %s", e)
+        raise HTTPException(status_code=500, detail=f"Fehler beim Abbrechen der verteilten Query: {str(e)}")
+
+# Live-Metriken (Server-Sent Events)
+@app.get("/api/stream/metrics")
+async def stream_metrics(request: Request, current_user: dict = Depends(get_stream_user)):
+    queue = live_sampler.subscribe()
+    
+    async def events():
+        try:
+            yield f"retry: {int(LIVE_SAMPLE_INTERVAL * 1000)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    # Zu langsamer Client; EventSource verbindet neu und erhält einen Snapshot
+                    break
+                event, payload = item
+                yield f"event: {event}\ndata: {payload}\n\n"
+        finally:
+            live_sampler.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Health Check
 @app.get("/api/health")
-async def health_check():
+def health_check():
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
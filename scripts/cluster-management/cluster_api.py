@@ -3,15 +3,21 @@
 # REST-API für die automatische Cluster-Erweiterung und -Verwaltung
 
 import os
+import re
 import json
 import time
 import logging
 import subprocess
 import psycopg2
+import psycopg2.pool
+import psycopg2.extras
 import docker
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from threading import Thread
+from threading import Thread, Lock, BoundedSemaphore
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError, wait
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # Konfiguration
@@ -42,52 +48,100 @@ WORKER_IMAGE = os.getenv("WORKER_IMAGE", "exapg-worker")
 BASE_WORKER_NAME = "exapg-worker"
 CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../config/postgresql'))
 
+# Verbindungspool zum Koordinator
+DB_POOL_MAX = int(os.getenv("CLUSTER_API_DB_POOL_MAX", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("CLUSTER_API_DB_POOL_TIMEOUT", "10"))  # Sekunden Wartezeit auf eine freie Verbindung
+
+# Statusabfrage
+STATUS_TIMEOUT = float(os.getenv("CLUSTER_STATUS_TIMEOUT", "0.8"))  # Sekunden für die gesamte Erfassung
+STATUS_CACHE_TTL = float(os.getenv("CLUSTER_STATUS_CACHE_TTL", "5"))  # Sekunden
+STATUS_THREADS = int(os.getenv("CLUSTER_STATUS_THREADS", "32"))
+STATUS_STATEMENT_TIMEOUT = float(os.getenv("CLUSTER_STATUS_STATEMENT_TIMEOUT", "5"))  # Sekunden je Statusabfrage
+
+# Scale-out
+SCALE_OUT_PARALLELISM = int(os.getenv("SCALE_OUT_PARALLELISM", "8"))  # gleichzeitig bereitgestellte Container
+SCALE_OUT_MAX_BATCH = int(os.getenv("SCALE_OUT_MAX_BATCH", "32"))
+WORKER_READY_TIMEOUT = int(os.getenv("WORKER_READY_TIMEOUT", "60"))  # Sekunden
+
+# Datenumverteilung
+REBALANCE_MAX_CONCURRENT_MOVES = int(os.getenv("REBALANCE_MAX_CONCURRENT_MOVES", "1"))  # Standard je Job, zur Laufzeit änderbar
+REBALANCE_MAX_MOVE_THREADS = int(os.getenv("REBALANCE_MAX_MOVE_THREADS", "8"))  # Obergrenze für max_concurrent_moves
+REBALANCE_THROTTLE_MB_PER_S = float(os.getenv("REBALANCE_THROTTLE_MB_PER_S", "0")) or None  # 0 = ungedrosselt
+REBALANCE_TRANSFER_MODE = os.getenv("REBALANCE_TRANSFER_MODE", "auto")  # 'auto', 'force_logical' oder 'block_writes'
+
 # Docker-Client initialisieren
 docker_client = docker.from_env()
 
-def get_db_connection():
-    """Datenbankverbindung herstellen"""
+db_pool = None
+db_pool_lock = Lock()
+db_pool_slots = BoundedSemaphore(DB_POOL_MAX)
+
+def get_db_pool():
+    """Verbindungspool zum Koordinator, beim ersten Zugriff angelegt"""
+    global db_pool
+    with db_pool_lock:
+        if db_pool is None:
+            db_pool = psycopg2.pool.ThreadedConnectionPool(
+                1, DB_POOL_MAX,
+                host=POSTGRES_HOST,
+                port=POSTGRES_PORT,
+                user=POSTGRES_USER,
+                password=POSTGRES_PASSWORD,
+                dbname=POSTGRES_DB
+            )
+        return db_pool
+
+@contextmanager
+def pooled_connection():
+    """Verbindung aus dem Pool; Sitzungszustand (z.B. temporäre Tabellen) wird bei Rückgabe verworfen"""
+    # ThreadedConnectionPool wirft bei Erschöpfung sofort einen Fehler; die
+    # Semaphore lässt Aufrufer stattdessen bis DB_POOL_TIMEOUT auf eine Verbindung warten
+    if not db_pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise psycopg2.pool.PoolError(f"Keine freie Datenbankverbindung innerhalb von {DB_POOL_TIMEOUT}s")
     try:
-        conn = psycopg2.connect(
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            dbname=POSTGRES_DB
-        )
-        conn.autocommit = True
-        return conn
-    except Exception as e:
-        logger.error(f"Datenbankverbindungsfehler: {e}")
-        return None
+        pool = get_db_pool()
+        conn = pool.getconn()
+        broken = False
+        try:
+            conn.autocommit = True
+            yield conn
+        except psycopg2.Error:
+            broken = bool(conn.closed)
+            raise
+        finally:
+            if not conn.closed and not broken:
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("DISCARD ALL")
+                except psycopg2.Error:
+                    broken = True
+            pool.putconn(conn, close=broken or bool(conn.closed))
+    finally:
+        db_pool_slots.release()
 
 def execute_sql(sql, params=None):
     """SQL-Anweisung ausführen"""
-    conn = get_db_connection()
-    if not conn:
-        return False, "Verbindung zur Datenbank konnte nicht hergestellt werden"
-    
     try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
-        
-        # Wenn es ein SELECT ist, Ergebnisse zurückgeben
-        if sql.strip().upper().startswith("SELECT"):
-            result = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            return True, result
-        
-        cursor.close()
-        conn.close()
-        return True, "SQL-Anweisung erfolgreich ausgeführt"
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                
+                # Wenn es ein SELECT ist, Ergebnisse zurückgeben
+                if sql.strip().upper().startswith("SELECT"):
+                    return True, cursor.fetchall()
+                
+                return True, "SQL-Anweisung erfolgreich ausgeführt"
+    except psycopg2.pool.PoolError as e:
+        logger.error(f"Datenbankverbindungsfehler: {e}")
+        return False, "Verbindung zur Datenbank konnte nicht hergestellt werden"
+    except psycopg2.OperationalError as e:
+        logger.error(f"Datenbankverbindungsfehler: {e}")
+        return False, "Verbindung zur Datenbank konnte nicht hergestellt werden"
     except Exception as e:
         logger.error(f"SQL-Ausführungsfehler: {e}")
-        if conn:
-            conn.close()
         return False, str(e)
 
 def get_worker_count():
@@ -104,41 +158,47 @@ def get_active_workers():
         return result
     return []
 
+def wait_for_worker_ready(worker_name, timeout=30):
+    """Wartet per pg_isready, bis der Worker Verbindungen annimmt"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = subprocess.run(
+                ["pg_isready", "-h", worker_name, "-U", POSTGRES_USER],
+                capture_output=True, text=True, timeout=2
+            )
+            if "accepting connections" in result.stdout or result.returncode == 0:
+                logger.info(f"Worker {worker_name} ist bereit für Verbindungen.")
+                return True, f"Worker {worker_name} ist bereit"
+        except subprocess.TimeoutExpired:
+            pass
+        time.sleep(1)
+    return False, f"Timeout: Worker {worker_name} ist nicht bereit"
+
+def register_worker(worker_name):
+    """Worker per citus_add_node registrieren, ohne eine Umverteilung auszulösen"""
+    success, result = execute_sql("SELECT * FROM citus_add_node(%s, 5432);", (worker_name,))
+    if success:
+        logger.info(f"Worker {worker_name} erfolgreich zu Citus hinzugefügt")
+        invalidate_cluster_status()
+        return True, f"Worker {worker_name} erfolgreich hinzugefügt"
+    logger.error(f"Fehler beim Hinzufügen des Workers {worker_name}: {result}")
+    return False, result
+
 def add_worker_to_citus(worker_name):
     """Worker-Knoten zu Citus hinzufügen"""
     try:
         # Warten bis Worker bereit ist
-        for _ in range(30):  # 30 Sekunden Timeout
-            try:
-                result = subprocess.run(
-                    ["pg_isready", "-h", worker_name, "-U", POSTGRES_USER],
-                    capture_output=True, text=True, timeout=2
-                )
-                if "accepting connections" in result.stdout or result.returncode == 0:
-                    logger.info(f"Worker {worker_name} ist bereit für Verbindungen.")
-                    break
-            except subprocess.TimeoutExpired:
-                pass
-            time.sleep(1)
-        else:
-            return False, f"Timeout: Worker {worker_name} ist nicht bereit"
-
-        # Worker zum Cluster hinzufügen
-        sql = f"SELECT * FROM citus_add_node('{worker_name}', 5432);"
-        success, result = execute_sql(sql)
+        ready, message = wait_for_worker_ready(worker_name)
+        if not ready:
+            return False, message
         
+        # Worker zum Cluster hinzufügen
+        success, message = register_worker(worker_name)
         if success:
-            logger.info(f"Worker {worker_name} erfolgreich zu Citus hinzugefügt")
-            
             # Datenumverteilung automatisch starten
-            rebalance_thread = Thread(target=rebalance_cluster)
-            rebalance_thread.daemon = True
-            rebalance_thread.start()
-            
-            return True, f"Worker {worker_name} erfolgreich hinzugefügt"
-        else:
-            logger.error(f"Fehler beim Hinzufügen des Workers {worker_name}: {result}")
-            return False, result
+            request_rebalance("add-worker")
+        return success, message
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Hinzufügen des Workers: {e}")
         return False, str(e)
@@ -165,6 +225,7 @@ def remove_worker_from_citus(worker_name, node_id):
         
         if success:
             logger.info(f"Worker {worker_name} erfolgreich aus Citus entfernt")
+            invalidate_cluster_status()
             return True, f"Worker {worker_name} erfolgreich entfernt"
         else:
             logger.error(f"Fehler beim Entfernen des Workers {worker_name}: {result}")
@@ -173,22 +234,407 @@ def remove_worker_from_citus(worker_name, node_id):
         logger.error(f"Unerwarteter Fehler beim Entfernen des Workers: {e}")
         return False, str(e)
 
-def rebalance_cluster():
-    """Daten im Cluster umverteilen für gleichmäßige Lastverteilung"""
+# Umverteilung als Job
+# Der Plan kommt aus get_rebalance_table_shards_plan(); jede Shard-Verschiebung wird
+# einzeln per citus_move_shard_placement ausgeführt und in admin.rebalance_moves
+# protokolliert. Ein Advisory-Lock stellt sicher, dass clusterweit nur ein Job läuft,
+# auch wenn die API in mehreren Prozessen betrieben wird.
+REBALANCE_LOCK_KEY = 7263512  # pg_try_advisory_lock-Schlüssel für den laufenden Job
+REBALANCE_POLL_INTERVAL = 1.0  # Sekunden zwischen Prüfungen von Einstellungen und Fortschritt
+REBALANCE_JOB_COLUMNS = """
+    job_id, status, trigger, rebalance_strategy, max_concurrent_moves, throttle_mb_per_s,
+    total_moves, total_bytes, owner, created_at, started_at, finished_at, error_message
+"""
+REBALANCE_MOVE_COLUMNS = """
+    move_id, job_id, table_name, shardid, shard_size, source_name, source_port,
+    target_name, target_port, status, started_at, finished_at, error_message
+"""
+
+rebalance_tables_ready = False
+rebalance_state = {"running": False, "pending": False}
+rebalance_state_lock = Lock()
+
+def fetch_rows(sql, params=None):
+    """Abfrage mit Ergebnis als Liste von dicts (auch für INSERT/UPDATE ... RETURNING)"""
+    with pooled_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()] if cursor.description else []
+
+def ensure_rebalance_tables():
+    """Job-Tabellen im Koordinator anlegen (einmal pro Prozess)"""
+    global rebalance_tables_ready
+    if rebalance_tables_ready:
+        return
+    fetch_rows("""
+        CREATE SCHEMA IF NOT EXISTS admin;
+        
+        CREATE TABLE IF NOT EXISTS admin.rebalance_jobs (
+            job_id BIGSERIAL PRIMARY KEY,
+            status VARCHAR(20) NOT NULL DEFAULT 'planning', -- 'planning', 'running', 'cancelling', 'succeeded', 'failed', 'cancelled'
+            trigger VARCHAR(50),
+            rebalance_strategy TEXT,
+            max_concurrent_moves INTEGER NOT NULL DEFAULT 1,
+            throttle_mb_per_s FLOAT, -- NULL = ungedrosselt
+            total_moves INTEGER DEFAULT 0,
+            total_bytes BIGINT DEFAULT 0,
+            owner VARCHAR(255),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP WITH TIME ZONE,
+            finished_at TIMESTAMP WITH TIME ZONE,
+            error_message TEXT
+        );
+        
+        CREATE TABLE IF NOT EXISTS admin.rebalance_moves (
+            move_id BIGSERIAL PRIMARY KEY,
+            job_id BIGINT NOT NULL REFERENCES admin.rebalance_jobs(job_id) ON DELETE CASCADE,
+            table_name TEXT,
+            shardid BIGINT NOT NULL,
+            shard_size BIGINT,
+            source_name TEXT NOT NULL,
+            source_port INTEGER NOT NULL,
+            target_name TEXT NOT NULL,
+            target_port INTEGER NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending', -- 'pending', 'running', 'done', 'failed', 'skipped'
+            started_at TIMESTAMP WITH TIME ZONE,
+            finished_at TIMESTAMP WITH TIME ZONE,
+            error_message TEXT
+        );
+        
+        CREATE INDEX IF NOT EXISTS rebalance_moves_job_idx ON admin.rebalance_moves (job_id, move_id);
+    """)
+    rebalance_tables_ready = True
+
+def create_rebalance_job(trigger, max_concurrent_moves=None, throttle_mb_per_s=None, strategy=None):
+    ensure_rebalance_tables()
+    rows = fetch_rows("""
+        INSERT INTO admin.rebalance_jobs (trigger, rebalance_strategy, max_concurrent_moves, throttle_mb_per_s)
+        VALUES (%s, %s, %s, %s)
+        RETURNING job_id
+    """, (
+        trigger,
+        strategy,
+        max_concurrent_moves or REBALANCE_MAX_CONCURRENT_MOVES,
+        throttle_mb_per_s if throttle_mb_per_s is not None else REBALANCE_THROTTLE_MB_PER_S
+    ))
+    return rows[0]["job_id"]
+
+def update_rebalance_job(job_id, **fields):
+    assignments = ", ".join(f"{name} = %s" for name in fields)
+    fetch_rows(f"UPDATE admin.rebalance_jobs SET {assignments} WHERE job_id = %s", (*fields.values(), job_id))
+
+def update_rebalance_move(move_id, **fields):
+    assignments = ", ".join(f"{name} = %s" for name in fields)
+    fetch_rows(f"UPDATE admin.rebalance_moves SET {assignments} WHERE move_id = %s", (*fields.values(), move_id))
+
+def request_rebalance(trigger="manual", max_concurrent_moves=None, throttle_mb_per_s=None, strategy=None):
+    """Legt einen Umverteilungs-Job an und startet ihn, sofern in diesem Prozess keiner läuft
+    
+    Läuft bereits einer, wird genau ein weiterer vorgemerkt und nach dessen Ende
+    gestartet; so führen mehrere kurz hintereinander hinzugefügte Worker nicht zu
+    sich überlappenden Umverteilungen. Rückgabe ist die Job-ID oder None, wenn
+    der Lauf nur vorgemerkt wurde.
+    """
+    with rebalance_state_lock:
+        if rebalance_state["running"]:
+            rebalance_state["pending"] = True
+            return None
+        rebalance_state["running"] = True
+    
     try:
-        time.sleep(5)  # Kurze Pause, damit sich der Cluster stabilisieren kann
-        logger.info("Starte automatische Datenumverteilung...")
+        job_id = create_rebalance_job(trigger, max_concurrent_moves, throttle_mb_per_s, strategy)
+    except Exception:
+        with rebalance_state_lock:
+            rebalance_state["running"] = False
+        raise
+    
+    rebalance_thread = Thread(target=run_rebalance_loop, args=(job_id,))
+    rebalance_thread.daemon = True
+    rebalance_thread.start()
+    return job_id
+
+def run_rebalance_loop(job_id):
+    while True:
+        rebalance_cluster(job_id)
+        with rebalance_state_lock:
+            if not rebalance_state["pending"]:
+                rebalance_state["running"] = False
+                return
+            rebalance_state["pending"] = False
+        try:
+            job_id = create_rebalance_job("pending")
+        except Exception as e:
+            logger.error(f"Vorgemerkte Datenumverteilung konnte nicht angelegt werden: {e}")
+            with rebalance_state_lock:
+                rebalance_state["running"] = False
+            return
+
+def open_rebalance_connection():
+    return psycopg2.connect(
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        dbname=POSTGRES_DB,
+        application_name="exapg_rebalance"
+    )
+
+def execute_move(move):
+    """Eine Shard-Gruppe verschieben; eigene Verbindung, da die Verschiebung lange dauern kann"""
+    started = time.monotonic()
+    conn = None
+    try:
+        update_rebalance_move(move["move_id"], status="running", started_at=datetime.now(timezone.utc))
+        conn = open_rebalance_connection()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT citus_move_shard_placement(%s, %s, %s, %s, %s, shard_transfer_mode := %s)",
+                (move["shardid"], move["source_name"], move["source_port"],
+                 move["target_name"], move["target_port"], REBALANCE_TRANSFER_MODE)
+            )
+        update_rebalance_move(move["move_id"], status="done", finished_at=datetime.now(timezone.utc))
+        logger.info(
+            f"Shard {move['shardid']} von {move['source_name']} nach {move['target_name']} verschoben "
+            f"({move['shard_size'] or 0} Bytes in {time.monotonic() - started:.1f}s)"
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Verschieben von Shard {move['shardid']}: {e}")
+        update_rebalance_move(move["move_id"], status="failed", finished_at=datetime.now(timezone.utc), error_message=str(e).strip())
+        return False
+    finally:
+        if conn is not None:
+            conn.close()
+
+def plan_rebalance(job_id, strategy):
+    """Plan von Citus holen und als Verschiebungen des Jobs speichern"""
+    if strategy:
+        plan_sql = "SELECT * FROM get_rebalance_table_shards_plan(rebalance_strategy := %s)"
+        params = (strategy,)
+    else:
+        plan_sql = "SELECT * FROM get_rebalance_table_shards_plan()"
+        params = None
+    plan = fetch_rows(plan_sql, params)
+    moves = []
+    for step in plan:
+        moves.extend(fetch_rows(f"""
+            INSERT INTO admin.rebalance_moves
+                (job_id, table_name, shardid, shard_size, source_name, source_port, target_name, target_port)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING {REBALANCE_MOVE_COLUMNS}
+        """, (
+            job_id, str(step["table_name"]), step["shardid"], step["shard_size"],
+            step["sourcename"], step["sourceport"], step["targetname"], step["targetport"]
+        )))
+    update_rebalance_job(
+        job_id,
+        total_moves=len(moves),
+        total_bytes=sum(move["shard_size"] or 0 for move in moves)
+    )
+    return moves
+
+def rebalance_cluster(job_id):
+    """Umverteilungs-Job ausführen: planen, Verschiebungen begrenzt parallel und gedrosselt ausführen"""
+    logger.info(f"Starte Datenumverteilung (Job {job_id})...")
+    lock_conn = None
+    try:
+        # Der Lock hängt an einer eigenen Sitzung und gilt bis zu deren Ende
+        lock_conn = open_rebalance_connection()
+        lock_conn.autocommit = True
+        with lock_conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (REBALANCE_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                update_rebalance_job(
+                    job_id, status="failed", finished_at=datetime.now(timezone.utc),
+                    error_message="Es läuft bereits eine Datenumverteilung"
+                )
+                logger.warning(f"Job {job_id}: es läuft bereits eine Datenumverteilung")
+                return
         
-        # Rebalancing-Funktion aufrufen
-        sql = "SELECT admin.rebalance_shards('public', 0.1);"
-        success, result = execute_sql(sql)
+        # Jobs, die ohne Lock als laufend markiert sind, gehören zu einem beendeten Prozess
+        fetch_rows("""
+            UPDATE admin.rebalance_jobs
+            SET status = 'failed', finished_at = CURRENT_TIMESTAMP,
+                error_message = 'Prozess wurde während der Umverteilung beendet'
+            WHERE status IN ('planning', 'running', 'cancelling') AND job_id <> %s
+        """, (job_id,))
         
-        if success:
-            logger.info("Datenumverteilung erfolgreich abgeschlossen")
-        else:
-            logger.error(f"Fehler bei der Datenumverteilung: {result}")
+        job = fetch_rows(f"SELECT {REBALANCE_JOB_COLUMNS} FROM admin.rebalance_jobs WHERE job_id = %s", (job_id,))[0]
+        update_rebalance_job(job_id, owner=f"{os.uname().nodename}:{os.getpid()}")
+        pending = plan_rebalance(job_id, job["rebalance_strategy"])
+        
+        # Nur aus 'planning' starten: ein während der Planung angeforderter Abbruch bleibt erhalten
+        started = fetch_rows("""
+            UPDATE admin.rebalance_jobs SET status = 'running', started_at = %s
+            WHERE job_id = %s AND status = 'planning'
+            RETURNING job_id
+        """, (datetime.now(timezone.utc), job_id))
+        if not started:
+            fetch_rows(
+                "UPDATE admin.rebalance_moves SET status = 'skipped' WHERE job_id = %s AND status = 'pending'",
+                (job_id,)
+            )
+            finish_rebalance_job(job_id, "cancelled")
+            return
+        
+        if not pending:
+            finish_rebalance_job(job_id, "succeeded")
+            logger.info(f"Job {job_id}: Cluster ist bereits balanciert")
+            return
+        
+        run_moves(job_id, pending)
     except Exception as e:
         logger.error(f"Unerwarteter Fehler bei der Datenumverteilung: {e}")
+        try:
+            update_rebalance_job(job_id, status="failed", finished_at=datetime.now(timezone.utc), error_message=str(e).strip())
+            # Nicht gestartete Verschiebungen nicht als ausstehend zurücklassen
+            fetch_rows(
+                "UPDATE admin.rebalance_moves SET status = 'skipped' WHERE job_id = %s AND status = 'pending'",
+                (job_id,)
+            )
+        except Exception:
+            pass
+    finally:
+        if lock_conn is not None:
+            lock_conn.close()
+
+def run_moves(job_id, pending):
+    """Verschiebungen ausführen
+    
+    Höchstens max_concurrent_moves gleichzeitig und nie zwei Verschiebungen mit
+    gemeinsamem Quell- oder Zielknoten. Mit throttle_mb_per_s startet eine neue
+    Verschiebung erst, wenn die seit Jobbeginn gestartete Datenmenge dies zulässt.
+    Beide Werte werden in jeder Runde aus dem Job gelesen und lassen sich daher
+    zur Laufzeit anpassen.
+    """
+    running = {}
+    failed = 0
+    cancelled = False
+    bytes_started = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=REBALANCE_MAX_MOVE_THREADS, thread_name_prefix="shard-move") as executor:
+        while pending or running:
+            job = fetch_rows("SELECT status, max_concurrent_moves, throttle_mb_per_s FROM admin.rebalance_jobs WHERE job_id = %s", (job_id,))[0]
+            if job["status"] == "cancelling":
+                cancelled = True
+                for move in pending:
+                    update_rebalance_move(move["move_id"], status="skipped")
+                pending = []
+            
+            limit = max(1, min(job["max_concurrent_moves"] or 1, REBALANCE_MAX_MOVE_THREADS))
+            busy_nodes = set()
+            for move in running.values():
+                busy_nodes.update({(move["source_name"], move["source_port"]), (move["target_name"], move["target_port"])})
+            
+            for move in list(pending):
+                if len(running) >= limit:
+                    break
+                nodes = {(move["source_name"], move["source_port"]), (move["target_name"], move["target_port"])}
+                if nodes & busy_nodes:
+                    continue
+                if job["throttle_mb_per_s"] and bytes_started:
+                    allowed = job["throttle_mb_per_s"] * 1024 * 1024 * (time.monotonic() - started)
+                    if bytes_started + (move["shard_size"] or 0) > allowed:
+                        break
+                pending.remove(move)
+                busy_nodes |= nodes
+                bytes_started += move["shard_size"] or 0
+                running[executor.submit(execute_move, move)] = move
+            
+            if running:
+                done, _ = wait(list(running), timeout=REBALANCE_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            else:
+                done = set()
+                time.sleep(REBALANCE_POLL_INTERVAL)
+            for future in done:
+                move = running.pop(future)
+                try:
+                    succeeded = future.result()
+                except Exception as e:
+                    # z.B. wenn auch das Verbuchen des Fehlers in execute_move scheitert
+                    logger.error(f"Verschiebung von Shard {move['shardid']} abgebrochen: {e}")
+                    succeeded = False
+                if not succeeded:
+                    failed += 1
+    
+    if cancelled:
+        status = "cancelled"
+    elif failed:
+        status = "failed"
+    else:
+        status = "succeeded"
+    status = finish_rebalance_job(job_id, status, f"{failed} Verschiebungen fehlgeschlagen" if failed else None)
+    logger.info(f"Datenumverteilung (Job {job_id}) beendet: {status}")
+
+def finish_rebalance_job(job_id, status, error_message=None):
+    """Job abschließen; ein bis dahin eingegangener Abbruch ergibt 'cancelled'. Gibt den Endstatus zurück."""
+    rows = fetch_rows("""
+        UPDATE admin.rebalance_jobs
+        SET status = CASE WHEN status = 'cancelling' THEN 'cancelled' ELSE %s END,
+            finished_at = %s, error_message = %s
+        WHERE job_id = %s
+        RETURNING status
+    """, (status, datetime.now(timezone.utc), error_message, job_id))
+    return rows[0]["status"] if rows else status
+
+def get_live_move_progress():
+    """Bereits kopierte Bytes laufender Verschiebungen je Shard aus get_rebalance_progress()"""
+    try:
+        rows = fetch_rows("SELECT shardid, target_shard_size FROM get_rebalance_progress()")
+        return {row["shardid"]: row["target_shard_size"] or 0 for row in rows}
+    except Exception as e:
+        logger.debug(f"get_rebalance_progress nicht verfügbar: {e}")
+        return {}
+
+def describe_rebalance_job(job, moves, live):
+    """Fortschritt, Durchsatz und Restzeit je Verschiebung und für den Job"""
+    now = datetime.now(timezone.utc)
+    bytes_moved = 0
+    for move in moves:
+        size = move["shard_size"] or 0
+        if move["status"] == "done":
+            move["bytes_moved"] = size
+        elif move["status"] == "running":
+            move["bytes_moved"] = min(live.get(move["shardid"], 0), size)
+        else:
+            move["bytes_moved"] = 0
+        
+        move["rate_mb_per_s"] = None
+        move["eta_seconds"] = None
+        if move["started_at"]:
+            elapsed = ((move["finished_at"] or now) - move["started_at"]).total_seconds()
+            if elapsed > 0 and move["bytes_moved"]:
+                rate = move["bytes_moved"] / elapsed
+                move["rate_mb_per_s"] = round(rate / (1024 * 1024), 2)
+                if move["status"] == "running":
+                    move["eta_seconds"] = round((size - move["bytes_moved"]) / rate)
+        bytes_moved += move["bytes_moved"]
+    
+    job["bytes_moved"] = bytes_moved
+    job["moves_done"] = sum(1 for move in moves if move["status"] == "done")
+    job["moves_running"] = sum(1 for move in moves if move["status"] == "running")
+    job["moves_failed"] = sum(1 for move in moves if move["status"] == "failed")
+    job["progress"] = round(bytes_moved / job["total_bytes"], 4) if job["total_bytes"] else None
+    job["rate_mb_per_s"] = None
+    job["eta_seconds"] = None
+    if job["started_at"]:
+        elapsed = ((job["finished_at"] or now) - job["started_at"]).total_seconds()
+        if elapsed > 0 and bytes_moved:
+            rate = bytes_moved / elapsed
+            job["rate_mb_per_s"] = round(rate / (1024 * 1024), 2)
+            if job["status"] in ("running", "cancelling"):
+                job["eta_seconds"] = round(((job["total_bytes"] or 0) - bytes_moved) / rate)
+    job["moves"] = moves
+    return job
+
+def serialize_rows(rows):
+    """Zeitstempel für jsonify als ISO-Strings"""
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, datetime):
+                row[key] = value.isoformat()
+    return rows
 
 def create_worker_container(worker_num):
     """Neuen Worker-Container erstellen"""
@@ -256,55 +702,284 @@ def remove_worker_container(worker_name):
         logger.error(f"Fehler beim Entfernen des Worker-Containers {worker_name}: {e}")
         return False, str(e)
 
+def next_worker_numbers(count):
+    """Die nächsten freien Worker-Nummern (weder als Container noch in pg_dist_node vergeben)"""
+    pattern = re.compile(rf"^{re.escape(BASE_WORKER_NAME)}-(\d+)$")
+    used = set()
+    names = [name.lstrip('/') for container in docker_client.api.containers(all=True) for name in container.get('Names') or []]
+    names += [name for _, name in get_active_workers()]
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            used.add(int(match.group(1)))
+    
+    numbers = []
+    candidate = 1
+    while len(numbers) < count:
+        if candidate not in used:
+            numbers.append(candidate)
+        candidate += 1
+    return numbers
+
+def provision_worker(worker_num):
+    """Container erstellen und auf Bereitschaft warten (ohne Registrierung)"""
+    success, worker_name = create_worker_container(worker_num)
+    if not success:
+        return {"number": worker_num, "name": None, "status": "failed", "message": worker_name}
+    ready, message = wait_for_worker_ready(worker_name, WORKER_READY_TIMEOUT)
+    return {"number": worker_num, "name": worker_name, "status": "ready" if ready else "failed", "message": message}
+
+scale_out_lock = Lock()
+
+def scale_out(count):
+    """Mehrere Worker gleichzeitig bereitstellen, gemeinsam registrieren und einmal umverteilen"""
+    # Von der Nummernvergabe bis zur Registrierung serialisieren: sonst wählen
+    # gleichzeitige Aufrufe dieselben freien Nummern und melden denselben Container
+    with scale_out_lock:
+        numbers = next_worker_numbers(count)
+        logger.info(f"Scale-out um {count} Worker: {numbers}")
+        
+        # Container parallel erstellen und parallel auf Bereitschaft warten
+        with ThreadPoolExecutor(max_workers=max(1, min(count, SCALE_OUT_PARALLELISM)), thread_name_prefix="scale-out") as executor:
+            workers = list(executor.map(provision_worker, numbers))
+        
+        # Registrierung nacheinander: citus_add_node sperrt die Metadaten ohnehin exklusiv
+        registered = 0
+        for worker in workers:
+            if worker["status"] != "ready":
+                continue
+            success, message = register_worker(worker["name"])
+            worker["status"] = "added" if success else "failed"
+            worker["message"] = message
+            registered += success
+        
+        rebalance_started = False
+        rebalance_job_id = None
+        if registered:
+            rebalance_job_id = request_rebalance("scale-out")
+            rebalance_started = True
+        
+        return {
+            "status": "ok" if registered == count else ("partial" if registered else "error"),
+            "requested": count,
+            "added": registered,
+            "workers": workers,
+            "rebalance_started": rebalance_started,
+            "rebalance_job_id": rebalance_job_id
+        }
+
+# Cluster-Status
+# Alle Teilabfragen (Container, Knotenliste, Statistiken, Shards, Erreichbarkeit
+# jedes Knotens) laufen parallel mit einer gemeinsamen Frist. Was bis dahin nicht
+# fertig ist, wird unter "incomplete" gemeldet statt die Antwort zu blockieren.
+status_executor = ThreadPoolExecutor(max_workers=STATUS_THREADS, thread_name_prefix="cluster-status")
+status_cache = {"expires": 0.0, "value": None}
+status_cache_lock = Lock()
+
+# Langsame Teilabfragen laufen über die Frist hinaus weiter; sie werden nicht erneut
+# gestartet, solange der vorige Lauf noch aktiv ist, und bis dahin gilt ihr letztes Ergebnis
+slow_status_futures = {}
+slow_status_values = {}
+slow_status_lock = Lock()
+
+def query_or_raise(sql):
+    """Statusabfrage mit statement_timeout, damit verwaiste Abfragen keine Poolverbindung dauerhaft belegen"""
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            # Gilt bis zur Rückgabe an den Pool; DISCARD ALL setzt ihn dort zurück
+            cursor.execute("SET statement_timeout = %s", (int(STATUS_STATEMENT_TIMEOUT * 1000),))
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+def list_cluster_containers():
+    """Ein einziger Aufruf der Docker-API statt eines inspect pro Container"""
+    containers = []
+    for container in docker_client.api.containers(all=True):
+        name = container['Names'][0].lstrip('/') if container.get('Names') else container['Id'][:12]
+        if name.startswith(BASE_WORKER_NAME) or name == "exapg-coordinator":
+            containers.append({
+                "name": name,
+                "status": container['State'],
+                "health": container.get('Status'),
+                "id": container['Id'][:12]
+            })
+    return containers
+
+def query_nodes():
+    return query_or_raise("SELECT nodeid, nodename, nodeport, noderole, isactive FROM pg_dist_node ORDER BY nodeid")
+
+def query_database_stats():
+    stats = query_or_raise("""
+        SELECT * FROM (
+            SELECT count(*) AS tables FROM pg_tables WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+        ) t1, (
+            SELECT count(*) AS distributed_tables FROM pg_dist_partition
+        ) t2, (
+            SELECT count(*) AS shards FROM pg_dist_shard
+        ) t3;
+    """)
+    return {
+        "total_tables": stats[0][0],
+        "distributed_tables": stats[0][1],
+        "total_shards": stats[0][2]
+    }
+
+def query_shard_counts():
+    """Shard-Platzierungen je Knoten aus den lokalen Metadaten"""
+    rows = query_or_raise("""
+        SELECT n.nodename, n.nodeport, count(*)
+        FROM pg_dist_placement p
+        JOIN pg_dist_node n ON n.groupid = p.groupid
+        GROUP BY n.nodename, n.nodeport
+    """)
+    return {(row[0], row[1]): row[2] for row in rows}
+
+def query_shard_sizes():
+    """Shard-Größen je Knoten; citus_shards fragt die Worker ab und ist daher der langsamste Teil"""
+    rows = query_or_raise("""
+        SELECT nodename, nodeport, COALESCE(sum(shard_size), 0)
+        FROM citus_shards
+        GROUP BY nodename, nodeport
+    """)
+    return {(row[0], row[1]): int(row[2]) for row in rows}
+
+def check_node(nodename, nodeport):
+    """Direkte Verbindung zum Knoten als Erreichbarkeitsprüfung (entspricht pg_isready plus Anmeldung)"""
+    started = time.monotonic()
+    try:
+        conn = psycopg2.connect(
+            host=nodename,
+            port=nodeport,
+            user=POSTGRES_USER,
+            password=POSTGRES_PASSWORD,
+            dbname=POSTGRES_DB,
+            connect_timeout=max(2, int(STATUS_TIMEOUT) + 1)
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_is_in_recovery()")
+                in_recovery = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        return {
+            "reachable": True,
+            "in_recovery": in_recovery,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+    except psycopg2.Error as e:
+        message = str(e).strip().splitlines()
+        return {"reachable": False, "error": message[0] if message else type(e).__name__}
+
+def wait_result(future, deadline, name, incomplete, default=None):
+    """Ergebnis eines Futures bis zur Frist; bei Timeout oder Fehler den Standardwert"""
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FuturesTimeoutError:
+        incomplete.append(name)
+    except Exception as e:
+        logger.warning(f"Cluster-Status: {name} fehlgeschlagen: {e}")
+        incomplete.append(name)
+    return default
+
+def submit_slow_status_query(name, function):
+    """Startet eine langsame Teilabfrage nur, wenn ihr voriger Lauf beendet ist"""
+    with slow_status_lock:
+        future = slow_status_futures.get(name)
+        if future is None or future.done():
+            future = status_executor.submit(function)
+            future.add_done_callback(lambda done: remember_slow_status(name, done))
+            slow_status_futures[name] = future
+        return future
+
+def remember_slow_status(name, future):
+    if not future.cancelled() and future.exception() is None:
+        with slow_status_lock:
+            slow_status_values[name] = future.result()
+
+def wait_slow_result(future, deadline, name, incomplete, default):
+    """Wie wait_result, liefert bei Timeout oder Fehler aber das letzte bekannte Ergebnis"""
+    value = wait_result(future, deadline, name, incomplete)
+    if value is not None:
+        return value
+    with slow_status_lock:
+        return slow_status_values.get(name, default)
+
+def collect_cluster_status():
+    """Cluster-Status parallel erfassen"""
+    deadline = time.monotonic() + STATUS_TIMEOUT
+    incomplete = []
+    futures = {
+        "nodes": status_executor.submit(query_nodes),
+        "containers": status_executor.submit(list_cluster_containers),
+        "database_stats": submit_slow_status_query("database_stats", query_database_stats),
+        "shard_counts": status_executor.submit(query_shard_counts),
+        "shard_sizes": submit_slow_status_query("shard_sizes", query_shard_sizes),
+    }
+    
+    nodes = wait_result(futures["nodes"], deadline, "nodes", incomplete, [])
+    checks = {
+        (nodename, nodeport): status_executor.submit(check_node, nodename, nodeport)
+        for _, nodename, nodeport, _, _ in nodes
+    }
+    
+    containers = wait_result(futures["containers"], deadline, "containers", incomplete, [])
+    db_stats = wait_slow_result(futures["database_stats"], deadline, "database_stats", incomplete, {})
+    shard_counts = wait_result(futures["shard_counts"], deadline, "shard_counts", incomplete, {})
+    shard_sizes = wait_slow_result(futures["shard_sizes"], deadline, "shard_sizes", incomplete, {})
+    
+    node_status = []
+    for nodeid, nodename, nodeport, noderole, isactive in nodes:
+        key = (nodename, nodeport)
+        health = wait_result(checks[key], deadline, f"node:{nodename}:{nodeport}", incomplete)
+        node_status.append({
+            "id": nodeid,
+            "name": nodename,
+            "port": nodeport,
+            "role": noderole,
+            "active": isactive,
+            "shards": shard_counts.get(key),
+            "shard_bytes": shard_sizes.get(key),
+            "health": health or {"reachable": None, "error": "timeout"}
+        })
+    
+    workers = [node for node in node_status if node["port"] == 5432 and node["role"] == "primary"]
+    return {
+        "status": "ok" if "nodes" not in incomplete else "degraded",
+        "cluster": {
+            "coordinator": "exapg-coordinator",
+            "worker_count": len(workers),
+            "workers": workers
+        },
+        "nodes": node_status,
+        "containers": containers,
+        "database_stats": db_stats,
+        "incomplete": incomplete,
+        "collected_at": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+def get_cached_cluster_status(refresh=False):
+    """Status aus dem Cache; gleichzeitige Anfragen teilen sich eine Erfassung"""
+    with status_cache_lock:
+        now = time.monotonic()
+        if not refresh and status_cache["value"] is not None and status_cache["expires"] > now:
+            return status_cache["value"]
+        value = collect_cluster_status()
+        status_cache["value"] = value
+        status_cache["expires"] = time.monotonic() + STATUS_CACHE_TTL
+        return value
+
+def invalidate_cluster_status():
+    with status_cache_lock:
+        status_cache["expires"] = 0.0
+
 # API-Endpunkte
 
 @app.route('/api/cluster/status', methods=['GET'])
 def get_cluster_status():
     """Status des Clusters abrufen"""
     try:
-        # Aktive Worker abrufen
-        workers = get_active_workers()
-        worker_count = len(workers)
-        
-        # Container-Informationen sammeln
-        containers = []
-        for container in docker_client.containers.list(all=True):
-            if container.name.startswith(BASE_WORKER_NAME) or container.name == "exapg-coordinator":
-                containers.append({
-                    "name": container.name,
-                    "status": container.status,
-                    "id": container.id[:12]
-                })
-        
-        # Datenbank-Statistiken
-        success, stats = execute_sql("""
-            SELECT * FROM (
-                SELECT count(*) AS tables FROM pg_tables WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
-            ) t1, (
-                SELECT count(*) AS distributed_tables FROM pg_dist_partition
-            ) t2, (
-                SELECT count(*) AS shards FROM pg_dist_shard
-            ) t3;
-        """)
-        
-        db_stats = {}
-        if success:
-            db_stats = {
-                "total_tables": stats[0][0],
-                "distributed_tables": stats[0][1],
-                "total_shards": stats[0][2]
-            }
-        
-        return jsonify({
-            "status": "ok",
-            "cluster": {
-                "coordinator": "exapg-coordinator",
-                "worker_count": worker_count,
-                "workers": [{"id": w[0], "name": w[1]} for w in workers]
-            },
-            "containers": containers,
-            "database_stats": db_stats
-        })
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        return jsonify(get_cached_cluster_status(refresh))
     except Exception as e:
         logger.error(f"Fehler beim Abrufen des Cluster-Status: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -313,32 +988,46 @@ def get_cluster_status():
 def add_worker():
     """Neuen Worker zum Cluster hinzufügen"""
     try:
-        # Nächste Worker-Nummer ermitteln
-        worker_count = get_worker_count()
-        next_worker_num = worker_count + 1
-        
-        # Neuen Worker-Container erstellen
-        success, worker_name = create_worker_container(next_worker_num)
-        if not success:
-            return jsonify({"status": "error", "message": worker_name}), 500
-        
-        # Warten, bis Container hochgefahren ist (10 Sekunden)
-        time.sleep(10)
-        
-        # Worker zu Citus hinzufügen
-        success, message = add_worker_to_citus(worker_name)
-        if not success:
-            return jsonify({"status": "error", "message": message}), 500
+        result = scale_out(1)
+        worker = result["workers"][0]
+        if result["status"] != "ok":
+            return jsonify({"status": "error", "message": worker["message"]}), 500
         
         return jsonify({
             "status": "ok",
-            "message": f"Worker {worker_name} erfolgreich zum Cluster hinzugefügt",
-            "worker": {"name": worker_name, "number": next_worker_num}
+            "message": f"Worker {worker['name']} erfolgreich zum Cluster hinzugefügt",
+            "worker": {"name": worker["name"], "number": worker["number"]}
         })
     except Exception as e:
         logger.error(f"Fehler beim Hinzufügen eines Workers: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/cluster/add-workers', methods=['POST'])
+def add_workers():
+    """Mehrere Worker in einem Schritt hinzufügen ({"count": N} oder {"target": Gesamtzahl})"""
+    try:
+        data = request.json or {}
+        if 'count' in data:
+            count = int(data['count'])
+        elif 'target' in data:
+            count = int(data['target']) - get_worker_count()
+        else:
+            return jsonify({"status": "error", "message": "count oder target ist erforderlich"}), 400
+        
+        if count < 1:
+            return jsonify({"status": "ok", "message": "Keine zusätzlichen Worker erforderlich", "added": 0, "workers": []})
+        if count > SCALE_OUT_MAX_BATCH:
+            return jsonify({"status": "error", "message": f"Maximal {SCALE_OUT_MAX_BATCH} Worker pro Aufruf"}), 400
+        
+        result = scale_out(count)
+        result["message"] = f"{result['added']} von {count} Workern hinzugefügt"
+        return jsonify(result), (200 if result["status"] != "error" else 500)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "count bzw. target muss eine Zahl sein"}), 400
+    except Exception as e:
+        logger.error(f"Fehler beim Hinzufügen mehrerer Worker: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/cluster/remove-worker', methods=['POST'])
 def remove_worker():
     """Worker aus dem Cluster entfernen"""
@@ -370,21 +1059,121 @@ def remove_worker():
 
 @app.route('/api/cluster/rebalance', methods=['POST'])
 def rebalance():
-    """Daten im Cluster manuell umverteilen"""
+    """Daten im Cluster manuell umverteilen
+    
+    Optional: {"max_concurrent_moves": N, "throttle_mb_per_s": X, "strategy": "by_disk_size"}
+    """
     try:
+        data = request.get_json(silent=True) or {}
+        max_concurrent_moves = int(data['max_concurrent_moves']) if data.get('max_concurrent_moves') is not None else None
+        throttle_mb_per_s = float(data['throttle_mb_per_s']) if data.get('throttle_mb_per_s') is not None else None
+        if max_concurrent_moves is not None and max_concurrent_moves < 1:
+            return jsonify({"status": "error", "message": "max_concurrent_moves muss mindestens 1 sein"}), 400
+        
         # Rebalancing in einem separaten Thread starten
-        rebalance_thread = Thread(target=rebalance_cluster)
-        rebalance_thread.daemon = True
-        rebalance_thread.start()
+        job_id = request_rebalance("manual", max_concurrent_moves, throttle_mb_per_s or None, data.get('strategy'))
         
         return jsonify({
             "status": "ok",
-            "message": "Datenumverteilung gestartet"
-        })
+            "message": "Datenumverteilung gestartet" if job_id else "Datenumverteilung läuft bereits, weitere vorgemerkt",
+            "job_id": job_id
+        }), 202
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "max_concurrent_moves und throttle_mb_per_s müssen Zahlen sein"}), 400
     except Exception as e:
         logger.error(f"Fehler beim Starten der Datenumverteilung: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/cluster/rebalance/jobs', methods=['GET'])
+def list_rebalance_jobs():
+    """Letzte Umverteilungs-Jobs, neueste zuerst"""
+    try:
+        ensure_rebalance_tables()
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        jobs = fetch_rows(f"""
+            SELECT {REBALANCE_JOB_COLUMNS}
+            FROM admin.rebalance_jobs
+            ORDER BY job_id DESC
+            LIMIT %s
+        """, (limit,))
+        return jsonify({"status": "ok", "jobs": serialize_rows(jobs)})
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit muss eine Zahl sein"}), 400
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Umverteilungs-Jobs: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/cluster/rebalance/jobs/<int:job_id>', methods=['GET'])
+def get_rebalance_job(job_id):
+    """Job mit allen Verschiebungen, Fortschritt, Durchsatz und Restzeit"""
+    try:
+        ensure_rebalance_tables()
+        jobs = fetch_rows(f"SELECT {REBALANCE_JOB_COLUMNS} FROM admin.rebalance_jobs WHERE job_id = %s", (job_id,))
+        if not jobs:
+            return jsonify({"status": "error", "message": f"Job {job_id} nicht gefunden"}), 404
+        moves = fetch_rows(f"""
+            SELECT {REBALANCE_MOVE_COLUMNS}
+            FROM admin.rebalance_moves
+            WHERE job_id = %s
+            ORDER BY move_id
+        """, (job_id,))
+        live = get_live_move_progress() if any(move["status"] == "running" for move in moves) else {}
+        job = describe_rebalance_job(jobs[0], moves, live)
+        job["moves"] = serialize_rows(job["moves"])
+        return jsonify({"status": "ok", "job": serialize_rows([job])[0]})
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen des Umverteilungs-Jobs {job_id}: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/cluster/rebalance/jobs/<int:job_id>', methods=['PATCH'])
+def tune_rebalance_job(job_id):
+    """Parallelität und Drosselung eines laufenden Jobs anpassen; wirkt ab der nächsten Verschiebung"""
+    try:
+        data = request.get_json(silent=True) or {}
+        fields = {}
+        if 'max_concurrent_moves' in data:
+            fields['max_concurrent_moves'] = int(data['max_concurrent_moves'])
+            if fields['max_concurrent_moves'] < 1:
+                return jsonify({"status": "error", "message": "max_concurrent_moves muss mindestens 1 sein"}), 400
+        if 'throttle_mb_per_s' in data:
+            # null oder 0 hebt die Drosselung auf
+            fields['throttle_mb_per_s'] = float(data['throttle_mb_per_s'] or 0) or None
+        if not fields:
+            return jsonify({"status": "error", "message": "max_concurrent_moves oder throttle_mb_per_s ist erforderlich"}), 400
+        
+        ensure_rebalance_tables()
+        assignments = ", ".join(f"{name} = %s" for name in fields)
+        jobs = fetch_rows(f"""
+            UPDATE admin.rebalance_jobs SET {assignments}
+            WHERE job_id = %s AND status IN ('planning', 'running')
+            RETURNING {REBALANCE_JOB_COLUMNS}
+        """, (*fields.values(), job_id))
+        if not jobs:
+            return jsonify({"status": "error", "message": f"Job {job_id} nicht gefunden oder nicht mehr aktiv"}), 409
+        return jsonify({"status": "ok", "job": serialize_rows(jobs)[0]})
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "max_concurrent_moves und throttle_mb_per_s müssen Zahlen sein"}), 400
+    except Exception as e:
+        logger.error(f"Fehler beim Anpassen des Umverteilungs-Jobs {job_id}: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/cluster/rebalance/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_rebalance_job(job_id):
+    """Job abbrechen: laufende Verschiebungen werden abgeschlossen, ausstehende übersprungen"""
+    try:
+        ensure_rebalance_tables()
+        jobs = fetch_rows("""
+            UPDATE admin.rebalance_jobs SET status = 'cancelling'
+            WHERE job_id = %s AND status IN ('planning', 'running')
+            RETURNING job_id
+        """, (job_id,))
+        if not jobs:
+            return jsonify({"status": "error", "message": f"Job {job_id} nicht gefunden oder nicht mehr aktiv"}), 409
+        return jsonify({"status": "ok", "message": f"Abbruch von Job {job_id} angefordert"}), 202
+    except Exception as e:
+        logger.error(f"Fehler beim Abbrechen des Umverteilungs-Jobs {job_id}: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/cluster/rolling-update', methods=['POST'])
 def rolling_update():
     """Rolling-Update der Worker-Knoten durchführen"""
@@ -10,13 +10,19 @@ Es unterstützt die Konvertierung einzelner Dateien oder ganzer Verzeichnisse.
 Beispielverwendung:
     python3 convert_sql.py --input exasol_query.sql --output exapg_query.sql
     python3 convert_sql.py --input-dir exasol_scripts/ --output-dir exapg_scripts/
+    python3 convert_sql.py --input-dir exasol_scripts/ --output-dir exapg_scripts/ --jobs 8
+    python3 convert_sql.py --input-dir exasol_scripts/ --benchmark
 """
 
 import os
 import re
 import sys
+import time
 import argparse
 import glob
+import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import logging
 
@@ -30,6 +36,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger('exasol2exapg')
 
+# Bei jeder Änderung an den Übersetzungsregeln erhöhen, damit der Cache
+# von process_directory veraltete Ergebnisse nicht wiederverwendet
+CONVERTER_VERSION = '2'
+
+# Standardname der Cache-Datei im Ausgabeverzeichnis
+CACHE_FILE = '.convert_sql_cache.sqlite'
+
 # Mapping von Exasol-Funktionen zu ExaPG-Funktionen
 FUNCTION_MAPPING = {
     # Datumsfunktionen
@@ -95,11 +108,349 @@ SYNTAX_MAPPING = {
     r'CREATE TABLE \1 (\2) PARTITION BY HASH (\3)',
 }
 
-def convert_sql(sql_content):
+# Funktionsregeln des Tokenizer-Übersetzers: Name -> (Argumentanzahl, Vorlage).
+# Die Argumente sind bereits übersetzt, verschachtelte Aufrufe werden also von
+# innen nach außen umgeschrieben.
+FUNCTION_RULES = {
+    # Datumsfunktionen
+    'ADD_DAYS': (2, lambda a: f"({a[0]} + ({a[1]}) * INTERVAL '1 day')"),
+    'ADD_MONTHS': (2, lambda a: f"({a[0]} + ({a[1]}) * INTERVAL '1 month')"),
+    'ADD_YEARS': (2, lambda a: f"({a[0]} + ({a[1]}) * INTERVAL '1 year')"),
+    'DAYS_BETWEEN': (2, lambda a: f"(({a[0]})::date - ({a[1]})::date)"),
+    'SECONDS_BETWEEN': (2, lambda a: f"EXTRACT(EPOCH FROM (({a[0]}) - ({a[1]})))"),
+    
+    # Zeichenkettenfunktionen
+    'INSTR': (2, lambda a: f"POSITION({a[1]} IN {a[0]})"),
+    'REGEXP_SUBSTR': (2, lambda a: f"substring({a[0]} from {a[1]})"),
+    
+    # NULL-Behandlung
+    'NVL': (2, lambda a: f"COALESCE({a[0]}, {a[1]})"),
+    'NULLIFZERO': (1, lambda a: f"NULLIF({a[0]}, 0)"),
+    'ZEROIFNULL': (1, lambda a: f"COALESCE({a[0]}, 0)"),
+    
+    # Mathematische Funktionen
+    'DIV': (2, lambda a: f"floor(({a[0]}) / ({a[1]}))"),
+    
+    # Aggregatfunktionen
+    'MEDIAN': (1, lambda a: f"PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {a[0]})"),
+}
+
+SYSTEM_TABLES = {
+    'EXA_ALL_TABLES': 'pg_tables',
+    'EXA_ALL_COLUMNS': 'information_schema.columns',
+    'EXA_DBA_USERS': 'pg_user',
+    'EXA_USER_SESSIONS': 'pg_stat_activity',
+    'EXA_ALL_CONSTRAINTS': 'information_schema.table_constraints',
+    'EXA_ALL_INDICES': 'pg_indexes',
+}
+
+# Ein Durchlauf über den Text zerlegt ihn in Tokens; Strings, Kommentare und
+# Bezeichner in Anführungszeichen werden dabei nie umgeschrieben
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>'[^']*(?:''[^']*)*'?)
+  | (?P<quoted>"[^"]*(?:""[^"]*)*"?)
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$#]*(?:\.[A-Za-z_][A-Za-z0-9_$#]*)*)
+  | (?P<punct>[(),;.])
+  | (?P<op>[^\sA-Za-z0-9_(),;.'"]+)
+""", re.VERBOSE)
+
+# Schnelltest: Texte ohne eines dieser Schlüsselwörter bleiben unverändert
+TRIGGER_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(list(FUNCTION_RULES) + list(SYSTEM_TABLES) + [
+        'LIMIT', 'DISTRIBUTE', 'CONNECT', 'IMPORT', 'EXPORT'
+    ]) + r')\b',
+    re.IGNORECASE
+)
+
+class Group:
+    """Geklammerter Ausdruck im Token-Baum."""
+    
+    __slots__ = ('items', 'closed')
+    
+    def __init__(self):
+        self.items = []
+        self.closed = False
+
+def tokenize(sql_content):
+    """Zerlegt SQL in einen Baum aus Tokens (Art, Text) und geklammerten Gruppen."""
+    root = []
+    stack = [root]
+    for match in TOKEN_PATTERN.finditer(sql_content):
+        kind = match.lastgroup
+        text = match.group()
+        if text == '(' and kind == 'punct':
+            group = Group()
+            stack[-1].append(group)
+            stack.append(group.items)
+        elif text == ')' and kind == 'punct' and len(stack) > 1:
+            stack.pop()
+            # Die zuletzt angehängte Gruppe der nun obersten Ebene ist geschlossen
+            stack[-1][-1].closed = True
+        else:
+            stack[-1].append((kind, text))
+    return root
+
+def render(items):
+    """Setzt Tokens und Gruppen wieder zu SQL-Text zusammen."""
+    parts = []
+    for item in items:
+        if type(item) is Group:
+            parts.append('(')
+            parts.append(render(item.items))
+            if item.closed:
+                parts.append(')')
+        else:
+            parts.append(item[1])
+    return ''.join(parts)
+
+def _is_significant(item):
+    """Leerraum und Kommentare sind für die Mustererkennung unerheblich."""
+    return type(item) is Group or item[0] not in ('ws', 'comment')
+
+def _keyword(item):
+    """Gibt das Schlüsselwort eines Tokens in Großbuchstaben zurück, sonst None."""
+    if type(item) is not Group and item[0] == 'word':
+        return item[1].upper()
+    return None
+
+def _split_arguments(items):
+    """Teilt die Elemente einer Gruppe an den Kommas der obersten Ebene."""
+    args = [[]]
+    for item in items:
+        if type(item) is not Group and item == ('punct', ','):
+            args.append([])
+        else:
+            args[-1].append(item)
+    return args
+
+def _match(items, sig, pos, pattern):
+    """
+    Prüft eine Folge signifikanter Elemente ab sig[pos] gegen ein Muster.
+    
+    Musterelemente sind Schlüsselwörter oder None als Platzhalter für genau ein
+    Element. Gibt die Platzhalter-Elemente zurück, oder None.
+    """
+    if pos + len(pattern) > len(sig):
+        return None
+    captured = []
+    for offset, expected in enumerate(pattern):
+        item = items[sig[pos + offset]]
+        if expected is None:
+            captured.append(item)
+        elif _keyword(item) != expected:
+            return None
+    return captured
+
+def _text(item):
+    """Rendert ein einzelnes Element."""
+    return render([item])
+
+def _translate_level(items):
+    """Übersetzt eine Ebene des Baums; Gruppen werden zuerst rekursiv übersetzt."""
+    out = []
+    for item in items:
+        if type(item) is Group:
+            item.items = _translate_level(item.items)
+            # Funktionsaufruf: Name, optional Leerraum, Argumentgruppe
+            call = _function_call(out, item)
+            if call:
+                out.append(call)
+                continue
+        elif item[0] == 'word':
+            replacement = _system_table(item[1])
+            if replacement:
+                item = ('sql', replacement)
+        out.append(item)
+    
+    return _rewrite_limit(out)
+
+def _function_call(out, group):
+    """Ersetzt einen Aufruf aus FUNCTION_RULES durch seine Übersetzung, falls möglich."""
+    pos = len(out) - 1
+    while pos >= 0 and type(out[pos]) is not Group and out[pos][0] == 'ws':
+        pos -= 1
+    # Qualifizierte Namen (schema.nvl) sind ein Token und damit benutzerdefinierte Funktionen
+    if pos < 0 or _keyword(out[pos]) not in FUNCTION_RULES:
+        return None
+    
+    arity, template = FUNCTION_RULES[_keyword(out[pos])]
+    args = [render(arg).strip() for arg in _split_arguments(group.items)]
+    if len(args) != arity or not all(args) or not group.closed:
+        return None
+    
+    del out[pos:]
+    return ('sql', template(args))
+
+def _system_table(name):
+    """Gibt die ExaPG-Entsprechung einer Exasol-Systemtabelle (auch SYS.name) zurück, sonst None."""
+    parts = name.upper().split('.')
+    if len(parts) == 1 or (len(parts) == 2 and parts[0] == 'SYS'):
+        return SYSTEM_TABLES.get(parts[-1])
+    return None
+
+def _rewrite_limit(items):
+    """Schreibt LIMIT n OFFSET m und LIMIT m, n in OFFSET/FETCH FIRST um."""
+    sig = [i for i, item in enumerate(items) if _is_significant(item)]
+    for pos in range(len(sig) - 1, -1, -1):
+        if _keyword(items[sig[pos]]) != 'LIMIT':
+            continue
+        
+        following = [items[i] for i in sig[pos + 1:pos + 4]]
+        if len(following) < 3 or not all(type(f) is not Group and f[0] == 'number' for f in (following[0], following[2])):
+            continue
+        if _keyword(following[1]) == 'OFFSET':
+            count, offset = following[0][1], following[2][1]
+        elif following[1] == ('punct', ','):
+            offset, count = following[0][1], following[2][1]
+        else:
+            continue
+        items[sig[pos]:sig[pos + 3] + 1] = [('sql', f"OFFSET {offset} ROWS FETCH FIRST {count} ROWS ONLY")]
+    return items
+
+def _translate_statement(items):
+    """Übersetzt die Anweisungskonstrukte einer einzelnen Anweisung."""
+    sig = [i for i, item in enumerate(items) if _is_significant(item)]
+    if not sig:
+        return items
+    
+    first = _keyword(items[sig[0]])
+    if first == 'IMPORT':
+        return _rewrite_transfer(items, sig, ['IMPORT', 'INTO', None, 'FROM', 'CSV'], 'FROM')
+    if first == 'EXPORT':
+        return _rewrite_transfer(items, sig, ['EXPORT', None, 'INTO', 'CSV'], 'TO')
+    if first == 'CREATE':
+        return _rewrite_distribute(items, sig)
+    if first == 'SELECT':
+        return _rewrite_connect_by(items, sig)
+    return items
+
+def _rewrite_transfer(items, sig, head, direction):
+    """Schreibt IMPORT INTO ... FROM CSV bzw. EXPORT ... INTO CSV in COPY um."""
+    captured = _match(items, sig, 0, head + ['AT', None, 'USER', None, 'IDENTIFIED', 'BY', None, 'FILE', None])
+    if not captured or type(captured[-1]) is Group or captured[-1][0] != 'string':
+        return items
+    
+    table, file_name = _text(captured[0]), captured[-1][1]
+    end = sig[len(head) + 8]
+    copy = f"COPY {table} {direction} {file_name} WITH (FORMAT csv, DELIMITER ',')"
+    return items[:sig[0]] + [('sql', copy)] + items[end + 1:]
+
+def _rewrite_distribute(items, sig):
+    """Schreibt DISTRIBUTE BY in CREATE TABLE in PARTITION BY HASH um."""
+    for pos, index in enumerate(sig):
+        item = items[index]
+        if type(item) is Group:
+            # DISTRIBUTE BY als letztes Element der Spaltenliste
+            columns = _extract_distribute(item)
+            if columns:
+                items.insert(index + 1, ('sql', f" PARTITION BY HASH ({columns})"))
+                return items
+        elif _keyword(item) == 'DISTRIBUTE' and pos + 1 < len(sig) and _keyword(items[sig[pos + 1]]) == 'BY':
+            columns = render(items[sig[pos + 1] + 1:]).strip()
+            return items[:index] + [('sql', f"PARTITION BY HASH ({columns})")]
+    return items
+
+def _extract_distribute(group):
+    """Entfernt ', DISTRIBUTE BY ...' aus einer Spaltenliste und gibt die Spalten zurück."""
+    args = _split_arguments(group.items)
+    if len(args) < 2:
+        return None
+    
+    last = [item for item in args[-1] if _is_significant(item)]
+    if len(last) < 3 or _keyword(last[0]) != 'DISTRIBUTE' or _keyword(last[1]) != 'BY':
+        return None
+    
+    columns = render(args[-1]).strip()[len('DISTRIBUTE'):].lstrip()[len('BY'):].strip()
+    # Letztes Komma der obersten Ebene samt folgendem Element entfernen
+    cut = max(i for i, item in enumerate(group.items) if type(item) is not Group and item == ('punct', ','))
+    group.items = group.items[:cut]
+    while group.items and not _is_significant(group.items[-1]):
+        group.items.pop()
+    group.items.append(('ws', '\n'))
+    return columns
+
+def _rewrite_connect_by(items, sig):
+    """Schreibt SELECT ... FROM t START WITH c CONNECT BY PRIOR a = b in eine rekursive CTE um."""
+    keywords = {_keyword(items[i]): pos for pos, i in enumerate(sig) if _keyword(items[i]) in ('FROM', 'WHERE', 'START', 'CONNECT')}
+    if 'FROM' not in keywords or 'START' not in keywords or 'CONNECT' not in keywords or 'WHERE' in keywords:
+        return items
+    
+    from_pos, start_pos, connect_pos = keywords['FROM'], keywords['START'], keywords['CONNECT']
+    if not (from_pos < start_pos < connect_pos) or _keyword(items[sig[start_pos + 1]]) != 'WITH':
+        return items
+    
+    # CONNECT BY [NOCYCLE] PRIOR a = b  oder  CONNECT BY b = PRIOR a
+    pos = connect_pos + 2
+    if pos < len(sig) and _keyword(items[sig[pos]]) == 'NOCYCLE':
+        pos += 1
+    condition = [items[i] for i in sig[pos:pos + 4]]
+    if len(condition) < 4:
+        return items
+    if _keyword(condition[0]) == 'PRIOR' and condition[2] == ('op', '='):
+        parent, child = _text(condition[1]), _text(condition[3])
+    elif _keyword(condition[2]) == 'PRIOR' and condition[1] == ('op', '='):
+        child, parent = _text(condition[0]), _text(condition[3])
+    else:
+        return items
+    
+    columns = render(items[sig[0] + 1:sig[from_pos]]).strip()
+    source = render(items[sig[from_pos] + 1:sig[start_pos]]).strip()
+    start = render(items[sig[start_pos + 1] + 1:sig[connect_pos]]).strip()
+    rest = render(items[sig[pos + 3] + 1:])
+    table = _text(items[sig[from_pos + 1]])
+    
+    recursive_columns = ', '.join(
+        f"t.{column}" if re.fullmatch(r'[A-Za-z_][A-Za-z0-9_$#]*|\*', column) else column
+        for column in (render(arg).strip() for arg in _split_arguments(items[sig[0] + 1:sig[from_pos]]))
+    )
+    return items[:sig[0]] + [('sql', (
+        f"WITH RECURSIVE tree AS (\n"
+        f"  SELECT {columns} FROM {source} WHERE {start}\n"
+        f"  UNION ALL\n"
+        f"  SELECT {recursive_columns} FROM {table} t JOIN tree tr ON t.{child} = tr.{parent}\n"
+        f")\n"
+        f"SELECT {columns} FROM tree"
+    ))] + ([('ws', rest)] if rest else [])
+
+def translate(sql_content):
+    """Übersetzt Exasol-SQL in einem Durchlauf über den Token-Baum."""
+    if not TRIGGER_PATTERN.search(sql_content):
+        return sql_content
+    
+    tree = _translate_level(tokenize(sql_content))
+    
+    # Anweisungskonstrukte je Anweisung (getrennt an ';' der obersten Ebene)
+    out = []
+    statement = []
+    for item in tree:
+        if type(item) is not Group and item == ('punct', ';'):
+            out.extend(_translate_statement(statement))
+            out.append(item)
+            statement = []
+        else:
+            statement.append(item)
+    out.extend(_translate_statement(statement))
+    
+    return render(out)
+
+def convert_sql(sql_content, engine='tokenizer'):
     """Konvertiert Exasol-SQL in ExaPG-SQL."""
-    # Original-SQL für Debugging
-    original_sql = sql_content
+    if engine == 'regex':
+        converted_sql = convert_sql_regex(sql_content)
+    else:
+        converted_sql = translate(sql_content)
     
+    # Wenn sich etwas geändert hat, fügen wir einen Kommentar hinzu
+    if converted_sql != sql_content:
+        converted_sql = f"-- Automatisch konvertiert von Exasol zu ExaPG\n-- Original:\n/*\n{sql_content}\n*/\n\n{converted_sql}"
+    
+    return converted_sql
+
+def convert_sql_regex(sql_content):
+    """Bisherige Konvertierung über die Regex-Mappings (für --engine regex und --benchmark)."""
     # Funktionen ersetzen
     for exasol_pattern, exapg_pattern in FUNCTION_MAPPING.items():
         sql_content = re.sub(exasol_pattern, exapg_pattern, sql_content, flags=re.IGNORECASE)
@@ -112,19 +463,15 @@ def convert_sql(sql_content):
     for exasol_syntax, exapg_syntax in SYNTAX_MAPPING.items():
         sql_content = re.sub(exasol_syntax, exapg_syntax, sql_content, flags=re.IGNORECASE | re.DOTALL)
     
-    # Wenn sich etwas geändert hat, fügen wir einen Kommentar hinzu
-    if sql_content != original_sql:
-        sql_content = f"-- Automatisch konvertiert von Exasol zu ExaPG\n-- Original:\n/*\n{original_sql}\n*/\n\n{sql_content}"
-    
     return sql_content
 
-def process_file(input_file, output_file):
+def process_file(input_file, output_file, engine='tokenizer'):
     """Verarbeitet eine einzelne SQL-Datei."""
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             sql_content = f.read()
         
-        converted_sql = convert_sql(sql_content)
+        converted_sql = convert_sql(sql_content, engine)
         
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(converted_sql)
@@ -135,32 +482,215 @@ def process_file(input_file, output_file):
         logger.error(f"Fehler bei der Konvertierung von {input_file}: {str(e)}")
         return False
 
-def process_directory(input_dir, output_dir, recursive=True):
-    """Verarbeitet ein Verzeichnis mit SQL-Dateien."""
+def benchmark(input_files, repeat=3):
+    """Vergleicht Laufzeit und Ergebnis des Tokenizer-Übersetzers mit der Regex-Konvertierung."""
+    contents = []
+    for input_file in input_files:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            contents.append(f.read())
+    
+    total_mb = sum(len(c.encode('utf-8')) for c in contents) / 1024 / 1024
+    results = {}
+    for engine, function in (('regex', convert_sql_regex), ('tokenizer', translate)):
+        best = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            outputs = [function(c) for c in contents]
+            duration = time.perf_counter() - start_time
+            best = duration if best is None else min(best, duration)
+        results[engine] = outputs
+        logger.info(
+            f"{engine:>9}: {len(contents)} Dateien, {total_mb:.2f} MB in {best:.3f}s "
+            f"({total_mb / best if best else 0:.2f} MB/s, bester von {repeat} Läufen)"
+        )
+    
+    differing = sum(1 for a, b in zip(results['regex'], results['tokenizer']) if a != b)
+    logger.info(f"Abweichende Ergebnisse: {differing} von {len(contents)} Dateien")
+    return results
+
+class ConversionCache:
+    """
+    Inhaltsbasierter Konvertierungscache in einer SQLite-Datei.
+    
+    'outputs' ordnet den Schlüssel aus Eingabe-Hash, CONVERTER_VERSION und
+    Übersetzer dem konvertierten Text zu; 'files' merkt sich je Eingabedatei
+    Größe, Änderungszeit, Konverter (Version und Übersetzer) und Schlüssel des
+    letzten Laufs, sodass unveränderte Dateien weder gelesen noch geschrieben
+    werden, solange derselbe Konverter verwendet wird.
+    """
+    
+    def __init__(self, path):
+        """Öffnet (oder erstellt) den Cache."""
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS outputs (key TEXT PRIMARY KEY, output TEXT NOT NULL)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                relative_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                converter TEXT
+            )
+        """)
+        # Caches älterer Versionen ohne Konverter-Spalte: Einträge gelten als veraltet
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(files)")]
+        if 'converter' not in columns:
+            self.conn.execute("ALTER TABLE files ADD COLUMN converter TEXT")
+        self.conn.commit()
+    
+    @staticmethod
+    def converter(engine):
+        """Kennung von Konverterversion und Übersetzer für die Tabelle 'files'."""
+        return f"{CONVERTER_VERSION}:{engine}"
+    
+    @staticmethod
+    def content_key(sql_content, engine):
+        """Bildet den Cache-Schlüssel aus Inhalt, Konverterversion und Übersetzer."""
+        digest = hashlib.sha256()
+        digest.update(f"{ConversionCache.converter(engine)}:".encode('utf-8'))
+        digest.update(sql_content.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def files(self):
+        """Gibt den Stand des letzten Laufs je Datei zurück."""
+        return {
+            row[0]: row[1:]
+            for row in self.conn.execute("SELECT relative_path, size, mtime_ns, key, converter FROM files")
+        }
+    
+    def lookup(self, key):
+        """Gibt die zwischengespeicherte Ausgabe zu einem Schlüssel zurück, sonst None."""
+        row = self.conn.execute("SELECT output FROM outputs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def store(self, relative_path, size, mtime_ns, key, converter, output=None):
+        """Verbucht eine Datei und optional ihre Ausgabe."""
+        if output is not None:
+            self.conn.execute("INSERT OR IGNORE INTO outputs (key, output) VALUES (?, ?)", (key, output))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (relative_path, size, mtime_ns, key, converter) VALUES (?, ?, ?, ?, ?)",
+            (relative_path, size, mtime_ns, key, converter)
+        )
+    
+    def commit(self):
+        """Schreibt ausstehende Änderungen."""
+        self.conn.commit()
+    
+    def close(self):
+        """Schließt den Cache."""
+        self.conn.commit()
+        self.conn.close()
+
+# Cache-Verbindung eines Worker-Prozesses (nur lesend, siehe _init_worker)
+_worker_cache = None
+
+def _init_worker(cache_path):
+    """Öffnet im Worker-Prozess eine eigene Verbindung zum Cache."""
+    global _worker_cache
+    _worker_cache = ConversionCache(cache_path) if cache_path else None
+
+def _convert_task(task):
+    """
+    Konvertiert eine Datei im Worker-Prozess.
+    
+    Gibt (relativer Pfad, Status, Schlüssel, neue Ausgabe oder Fehlermeldung)
+    zurück; Status ist 'unchanged', 'cached', 'converted' oder 'error'.
+    """
+    input_file, output_file, relative_path, previous_key, engine = task
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+        
+        key = ConversionCache.content_key(sql_content, engine)
+        # Nur die Änderungszeit hat sich geändert
+        if key == previous_key and os.path.exists(output_file):
+            return relative_path, 'unchanged', key, None
+        
+        converted_sql = _worker_cache.lookup(key) if _worker_cache else None
+        status = 'cached'
+        if converted_sql is None:
+            converted_sql = convert_sql(sql_content, engine)
+            status = 'converted'
+        
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(converted_sql)
+        
+        return relative_path, status, key, converted_sql if status == 'converted' else None
+    except Exception as e:
+        return relative_path, 'error', None, str(e)
+
+def process_directory(input_dir, output_dir, recursive=True, engine='tokenizer', jobs=None, cache_path=None):
+    """
+    Verarbeitet ein Verzeichnis mit SQL-Dateien.
+    
+    Die Dateien werden auf jobs Prozesse verteilt (Standard: alle Kerne). Mit
+    cache_path werden nur neue oder geänderte Dateien konvertiert; Dateien mit
+    bereits bekanntem Inhalt werden aus dem Cache geschrieben.
+    """
     # Ausgabeverzeichnis erstellen, falls es nicht existiert
     os.makedirs(output_dir, exist_ok=True)
     
     # Dateimuster
     pattern = os.path.join(input_dir, '**/*.sql' if recursive else '*.sql')
     
-    # Alle passenden Dateien verarbeiten
-    success_count = 0
-    error_count = 0
+    cache = ConversionCache(cache_path) if cache_path else None
+    known_files = cache.files() if cache else {}
     
+    # Unveränderte Dateien (gleiche Größe, Änderungszeit und Konverter) gar nicht erst öffnen
+    converter = ConversionCache.converter(engine)
+    tasks = []
+    stats = {}
+    skipped_count = 0
     for input_file in glob.glob(pattern, recursive=recursive):
         relative_path = os.path.relpath(input_file, input_dir)
         output_file = os.path.join(output_dir, relative_path)
+        stat = os.stat(input_file)
+        stats[relative_path] = (stat.st_size, stat.st_mtime_ns)
         
-        # Zielverzeichnis erstellen, falls es nicht existiert
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        if process_file(input_file, output_file):
-            success_count += 1
-        else:
-            error_count += 1
+        known = known_files.get(relative_path)
+        if known and known[:2] == stats[relative_path] and known[3] == converter and os.path.exists(output_file):
+            skipped_count += 1
+            continue
+        tasks.append((input_file, output_file, relative_path, known[2] if known else None, engine))
+    
+    # Alle geänderten Dateien verarbeiten
+    counts = {'converted': 0, 'cached': 0, 'unchanged': skipped_count, 'error': 0}
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache_path,))
+        results = executor.map(_convert_task, tasks, chunksize=max(1, min(64, len(tasks) // (jobs * 4))))
+    else:
+        executor = None
+        _init_worker(cache_path)
+        results = map(_convert_task, tasks)
+    
+    try:
+        for relative_path, status, key, payload in results:
+            counts[status] += 1
+            if status == 'error':
+                logger.error(f"Fehler bei der Konvertierung von {relative_path}: {payload}")
+                continue
+            
+            logger.debug(f"{status}: {relative_path}")
+            if cache:
+                cache.store(relative_path, *stats[relative_path], key, converter, payload)
+                if sum(counts.values()) % 1000 == 0:
+                    cache.commit()
+    finally:
+        if executor:
+            executor.shutdown()
+        if cache:
+            cache.close()
     
-    logger.info(f"Verarbeitung abgeschlossen: {success_count} Dateien erfolgreich konvertiert, {error_count} Fehler")
-    return success_count, error_count
+    success_count = counts['converted'] + counts['cached'] + counts['unchanged']
+    logger.info(
+        f"Verarbeitung abgeschlossen: {counts['converted']} Dateien konvertiert, {counts['cached']} aus dem Cache, "
+        f"{counts['unchanged']} unverändert, {counts['error']} Fehler"
+    )
+    return success_count, counts['error']
 
 def main():
     """Hauptfunktion."""
@@ -173,6 +703,16 @@ def main():
     parser.add_argument('--output', help='Ausgabe-SQL-Datei (ExaPG)')
     parser.add_argument('--output-dir', help='Ausgabeverzeichnis für konvertierte Dateien')
     parser.add_argument('--non-recursive', action='store_true', help='Verzeichnisse nicht rekursiv durchsuchen')
+    parser.add_argument('--engine', choices=['tokenizer', 'regex'], default='tokenizer', 
+                        help='Übersetzer: tokenizer (Standard, ein Durchlauf pro Anweisung) oder die bisherigen Regex-Mappings')
+    parser.add_argument('--jobs', type=int, 
+                        help='Anzahl paralleler Prozesse für --input-dir (Standard: alle Kerne)')
+    parser.add_argument('--cache', 
+                        help=f'Cache-Datei für inkrementelle Läufe (Standard: {CACHE_FILE} im Ausgabeverzeichnis)')
+    parser.add_argument('--no-cache', action='store_true', 
+                        help='Alle Dateien neu konvertieren, ohne Cache')
+    parser.add_argument('--benchmark', action='store_true', 
+                        help='Beide Übersetzer auf den Eingabedateien messen und vergleichen, nichts schreiben')
     parser.add_argument('--verbose', action='store_true', help='Ausführliche Ausgabe')
     
     args = parser.parse_args()
@@ -181,12 +721,22 @@ def main():
     if args.verbose:
         logger.setLevel(logging.DEBUG)
     
+    # Übersetzer vergleichen
+    if args.benchmark:
+        if args.input:
+            input_files = [args.input]
+        else:
+            pattern = os.path.join(args.input_dir, '*.sql' if args.non_recursive else '**/*.sql')
+            input_files = glob.glob(pattern, recursive=not args.non_recursive)
+        benchmark(input_files)
+        return 0
+    
     # Einzelne Datei verarbeiten
     if args.input:
         if not args.output:
             parser.error("Bei Verwendung von --input ist --output erforderlich.")
         
-        if process_file(args.input, args.output):
+        if process_file(args.input, args.output, args.engine):
             logger.info("Konvertierung erfolgreich.")
             return 0
         else:
@@ -201,7 +751,10 @@ def main():
         success_count, error_count = process_directory(
             args.input_dir, 
             args.output_dir, 
-            recursive=not args.non_recursive
+            recursive=not args.non_recursive,
+            engine=args.engine,
+            jobs=args.jobs,
+            cache_path=None if args.no_cache else (args.cache or os.path.join(args.output_dir, CACHE_FILE))
         )
         
         if error_count == 0:
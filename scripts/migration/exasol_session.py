@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exasol-Sitzungen für die Migrationswerkzeuge
+
+Dieses Modul kapselt den Zugriff auf Exasol für parallel_migrator.py und
+extract_schema.py. Statt für jede Katalogabfrage einen neuen exaplus-Prozess
+zu starten, werden langlebige Sitzungen in einem Pool gehalten:
+
+    - PyexasolSession: treiberbasierte Verbindung (pyexasol), falls installiert
+    - ExaplusSession:  exaplus-CLI als Rückfall, mehrere Abfragen pro Aufruf
+    - FakeExasolSession: SQLite-basierte Offline-Quelle aus einer JSON-Fixture
+
+Die DSN entscheidet über die Implementierung:
+
+    exa:user/password@host:port   -> pyexasol, sonst exaplus
+    fake:/pfad/zur/fixture.json   -> FakeExasolSession
+"""
+
+import os
+import re
+import io
+import csv
+import json
+import queue
+import shutil
+import sqlite3
+import logging
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import pyexasol
+except ImportError:
+    pyexasol = None
+
+logger = logging.getLogger('exasol_session')
+
+DSN_PATTERN = re.compile(r'^exa:(?P<user>[^/]+)/(?P<password>[^@]+)@(?P<host>.+)$')
+
+def parse_csv_result(text):
+    """Wandelt eine CSV-Ausgabe mit Headerzeile in eine Liste von Wörterbüchern um."""
+    reader = csv.reader(io.StringIO(text))
+    headers = next(reader, None)
+    if not headers:
+        return []
+    
+    headers = [h.strip().upper() for h in headers]
+    return [
+        {header: (row[i] if i < len(row) else None) for i, header in enumerate(headers)}
+        for row in reader if row
+    ]
+
+def format_csv_line(values):
+    """Formatiert eine Zeile als CSV; NULL wird als leerer String ausgegeben."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(['' if v is None else v for v in values])
+    return buffer.getvalue()
+
+class ExaplusSession:
+    """Exasol-Zugriff über die exaplus-CLI (Rückfall ohne Treiber)."""
+    
+    def __init__(self, dsn):
+        """Initialisiert die Sitzung mit der DSN."""
+        self.dsn = dsn
+    
+    def execute(self, query):
+        """Führt eine Abfrage aus und gibt das Ergebnis als Liste von Wörterbüchern zurück."""
+        return self.execute_batch([query])[0]
+    
+    def execute_batch(self, queries):
+        """
+        Führt mehrere Abfragen mit einem einzigen exaplus-Aufruf aus.
+        
+        Jede Ergebnismenge wird per SPOOL in eine eigene Datei geschrieben,
+        sodass der Prozessstart nur einmal pro Batch anfällt.
+        """
+        work_dir = tempfile.mkdtemp(prefix='exaplus_batch_')
+        try:
+            script_path = os.path.join(work_dir, 'batch.sql')
+            result_paths = [os.path.join(work_dir, f'result_{i}.csv') for i in range(len(queries))]
+            
+            with open(script_path, 'w') as f:
+                for query, result_path in zip(queries, result_paths):
+                    f.write(f"SPOOL '{result_path}';\n")
+                    f.write(query.strip().rstrip(';') + ";\n")
+                    f.write("SPOOL OFF;\n")
+            
+            cmd = [
+                'exaplus', '-c', self.dsn,
+                '-q', script_path,
+                '-L', '-x', '-s', ','
+            ]
+            subprocess.check_call(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            
+            results = []
+            for result_path in result_paths:
+                with open(result_path, 'r', newline='') as f:
+                    results.append(parse_csv_result(f.read()))
+            return results
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def stream_query(self, query):
+        """
+        Liefert das Ergebnis einer Abfrage als Strom von CSV-Zeilen (mit Header).
+        
+        exaplus schreibt in eine Named Pipe statt in eine Datei. Der Kernel-Puffer
+        der Pipe begrenzt den Speicherbedarf und bremst exaplus aus, solange der
+        Verbraucher nicht nachkommt.
+        """
+        pipe_dir = tempfile.mkdtemp(prefix='exasol_stream_')
+        query_file_path = os.path.join(pipe_dir, 'query.sql')
+        pipe_path = os.path.join(pipe_dir, 'data.csv')
+        
+        with open(query_file_path, 'w') as f:
+            f.write(query)
+        os.mkfifo(pipe_path)
+        
+        cmd = [
+            'exaplus', '-c', self.dsn,
+            '-q', query_file_path,
+            '-o', pipe_path,
+            '-L', '-x', '-s', ',',
+            '--null', ''  # NULL-Werte als leere Strings darstellen
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        
+        # Falls exaplus abbricht, bevor es die Pipe öffnet, würde open() ewig blockieren
+        watcher = threading.Thread(target=self._release_pipe, args=(process, pipe_path))
+        watcher.daemon = True
+        watcher.start()
+        
+        try:
+            with open(pipe_path, 'r', newline='') as pipe:
+                for line in pipe:
+                    yield line
+            
+            stderr = process.communicate()[1]
+            if process.returncode != 0:
+                raise RuntimeError(
+                    f"exaplus beendet mit Code {process.returncode}: "
+                    f"{stderr.decode('utf-8', 'replace').strip()}"
+                )
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            watcher.join(timeout=1)
+            shutil.rmtree(pipe_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _release_pipe(process, pipe_path):
+        """Gibt einen blockierten Leser der Pipe frei, sobald exaplus beendet ist."""
+        process.wait()
+        try:
+            # Schlägt mit ENXIO fehl, wenn kein Leser mehr wartet
+            fd = os.open(pipe_path, os.O_WRONLY | os.O_NONBLOCK)
+            os.close(fd)
+        except OSError:
+            pass
+    
+    def close(self):
+        """Nichts zu schließen; jeder Aufruf ist ein eigener Prozess."""
+
+class PyexasolSession:
+    """Langlebige treiberbasierte Exasol-Verbindung über pyexasol."""
+    
+    def __init__(self, dsn):
+        """Baut die Verbindung anhand einer DSN "exa:user/password@host:port" auf."""
+        match = DSN_PATTERN.match(dsn)
+        if not match:
+            raise ValueError(f"Ungültige Exasol-DSN: {dsn}")
+        
+        self.connection = pyexasol.connect(
+            dsn=match.group('host'),
+            user=match.group('user'),
+            password=match.group('password'),
+            fetch_dict=False
+        )
+    
+    def execute(self, query):
+        """Führt eine Abfrage aus und gibt das Ergebnis als Liste von Wörterbüchern zurück."""
+        statement = self.connection.execute(query)
+        headers = [name.upper() for name in statement.column_names()]
+        # Werte als Strings liefern, wie bei der CSV-Ausgabe von exaplus
+        return [
+            {header: ('' if value is None else str(value)) for header, value in zip(headers, row)}
+            for row in statement
+        ]
+    
+    def execute_batch(self, queries):
+        """Führt mehrere Abfragen nacheinander über dieselbe Verbindung aus."""
+        return [self.execute(query) for query in queries]
+    
+    def stream_query(self, query):
+        """Liefert das Ergebnis einer Abfrage als Strom von CSV-Zeilen (mit Header)."""
+        statement = self.connection.execute(query)
+        yield format_csv_line(statement.column_names())
+        for row in statement:
+            yield format_csv_line(row)
+    
+    def close(self):
+        """Schließt die Verbindung."""
+        self.connection.close()
+
+class FakeExasolSession:
+    """
+    Offline-Stand-in für Exasol auf Basis von SQLite.
+    
+    Die Fixture beschreibt Tabellen, Spalten und Zeilen:
+        
+        {"tables": {"SALES.ORDERS": {
+            "columns": [{"name": "ID", "type": "DECIMAL(18,0)", "primary_key": 1,
+                         "distribution_key": true, "nullable": false}, ...],
+            "rows": [[1, "..."], ...],
+            "foreign_keys": [{"columns": ["CUSTOMER_ID"], "references": "SALES.CUSTOMERS",
+                              "referenced_columns": ["ID"]}]}}}
+    
+    Daraus werden EXA_ALL_TABLES, EXA_ALL_COLUMNS, EXA_ALL_CONSTRAINTS,
+    EXA_ALL_CONSTRAINT_COLUMNS, EXA_ALL_FOREIGN_KEYS und EXA_ALL_DISTRIBUTION_KEYS
+    sowie je Schema eine angehängte Datenbank erzeugt. Das von SQLite nicht
+    unterstützte STRING_AGG(...) WITHIN GROUP (ORDER BY ...) wird vor der
+    Ausführung umgeschrieben, sodass die Katalog- und Exportabfragen von
+    parallel_migrator.py und extract_schema.py unverändert laufen.
+    """
+    
+    TYPE_PATTERN = re.compile(r'^(?P<type>[A-Z ]+?)\s*(\((?P<p>\d+)(,\s*(?P<s>\d+))?\))?$')
+    STRING_AGG_PATTERN = re.compile(
+        r'STRING_AGG\(\s*([^,()]+?)\s*,\s*(\'[^\']*\')\s*\)\s*WITHIN\s+GROUP\s*\(\s*ORDER\s+BY\s+([^()]+?)\s*\)',
+        re.IGNORECASE
+    )
+    
+    class StringAgg:
+        """Aggregat für STRING_AGG mit Sortierung (SQLite kennt kein WITHIN GROUP)."""
+        
+        def __init__(self):
+            self.items = []
+        
+        def step(self, value, separator, order_key):
+            if value is not None:
+                self.items.append((order_key, value, separator))
+        
+        def finalize(self):
+            if not self.items:
+                return None
+            self.items.sort(key=lambda item: item[0])
+            return self.items[0][2].join(str(item[1]) for item in self.items)
+    
+    def __init__(self, fixture_path):
+        """Baut die SQLite-Datenbank aus der Fixture auf."""
+        with open(fixture_path, 'r') as f:
+            fixture = json.load(f)
+        
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.create_function('MOD', 2, lambda a, b: a % b if a is not None and b else None)
+        self.conn.create_aggregate('EXA_STRING_AGG', 3, self.StringAgg)
+        self._create_catalog()
+        
+        for qualified_name, spec in fixture.get('tables', {}).items():
+            schema, table = qualified_name.split('.', 1)
+            self._create_table(schema, table, spec)
+        self.conn.commit()
+    
+    def _create_catalog(self):
+        """Legt die Exasol-Systemtabellen an."""
+        self.conn.executescript("""
+            CREATE TABLE EXA_ALL_TABLES (
+                table_schema TEXT, table_name TEXT, table_row_count INTEGER
+            );
+            CREATE TABLE EXA_ALL_COLUMNS (
+                table_schema TEXT, table_name TEXT, column_name TEXT, data_type TEXT,
+                numeric_precision INTEGER, numeric_scale INTEGER, character_maximum_length INTEGER,
+                ordinal_position INTEGER, is_nullable TEXT, column_default TEXT,
+                column_is_distribution_key BOOLEAN
+            );
+            CREATE TABLE EXA_ALL_CONSTRAINTS (
+                constraint_schema TEXT, table_name TEXT, constraint_name TEXT, constraint_type TEXT
+            );
+            CREATE TABLE EXA_ALL_CONSTRAINT_COLUMNS (
+                constraint_schema TEXT, constraint_name TEXT, column_name TEXT, ordinal_position INTEGER
+            );
+            CREATE TABLE EXA_ALL_FOREIGN_KEYS (
+                constraint_schema TEXT, constraint_name TEXT, column_name TEXT,
+                referenced_table TEXT, referenced_column TEXT
+            );
+            CREATE TABLE EXA_ALL_DISTRIBUTION_KEYS (
+                schema_name TEXT, table_name TEXT, column_name TEXT, distribution_order INTEGER
+            );
+        """)
+    
+    def _translate(self, query):
+        """Schreibt Exasol-spezifische Syntax in SQLite-Syntax um."""
+        return self.STRING_AGG_PATTERN.sub(r'EXA_STRING_AGG(\1, \2, \3)', query)
+    
+    def _create_table(self, schema, table, spec):
+        """Legt eine Tabelle samt Katalogeinträgen und Daten an."""
+        attached = [row[1] for row in self.conn.execute("PRAGMA database_list")]
+        if schema not in attached:
+            self.conn.execute(f"ATTACH DATABASE ':memory:' AS {schema}")
+        
+        columns = spec['columns']
+        rows = spec.get('rows', [])
+        
+        self.conn.execute(
+            f"CREATE TABLE {schema}.{table} ({', '.join(col['name'] for col in columns)})"
+        )
+        if rows:
+            placeholders = ', '.join('?' for _ in columns)
+            self.conn.executemany(f"INSERT INTO {schema}.{table} VALUES ({placeholders})", rows)
+        
+        self.conn.execute("INSERT INTO EXA_ALL_TABLES VALUES (?, ?, ?)", (schema, table, len(rows)))
+        
+        pk_columns = []
+        distribution_order = 0
+        for position, col in enumerate(columns, start=1):
+            match = self.TYPE_PATTERN.match(col['type'].upper())
+            data_type = match.group('type') if match else col['type'].upper()
+            precision = match.group('p') if match else None
+            scale = match.group('s') if match else None
+            is_char = data_type in ('VARCHAR', 'CHAR')
+            
+            self.conn.execute(
+                "INSERT INTO EXA_ALL_COLUMNS VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    schema, table, col['name'], data_type,
+                    None if is_char else precision,
+                    None if is_char else (scale or (0 if precision else None)),
+                    precision if is_char else None,
+                    position,
+                    'YES' if col.get('nullable', True) else 'NO',
+                    col.get('default'),
+                    bool(col.get('distribution_key'))
+                )
+            )
+            if col.get('primary_key'):
+                pk_columns.append((int(col['primary_key']), col['name']))
+            if col.get('distribution_key'):
+                distribution_order += 1
+                self.conn.execute(
+                    "INSERT INTO EXA_ALL_DISTRIBUTION_KEYS VALUES (?, ?, ?, ?)",
+                    (schema, table, col['name'], distribution_order)
+                )
+        
+        if pk_columns:
+            constraint_name = f"PK_{table}"
+            self.conn.execute(
+                "INSERT INTO EXA_ALL_CONSTRAINTS VALUES (?, ?, ?, 'PRIMARY KEY')",
+                (schema, table, constraint_name)
+            )
+            self.conn.executemany(
+                "INSERT INTO EXA_ALL_CONSTRAINT_COLUMNS VALUES (?, ?, ?, ?)",
+                [(schema, constraint_name, name, pos) for pos, name in sorted(pk_columns)]
+            )
+        
+        for number, fk in enumerate(spec.get('foreign_keys', []), start=1):
+            constraint_name = f"FK_{table}_{number}"
+            self.conn.execute(
+                "INSERT INTO EXA_ALL_CONSTRAINTS VALUES (?, ?, ?, 'FOREIGN KEY')",
+                (schema, table, constraint_name)
+            )
+            for pos, (name, referenced) in enumerate(zip(fk['columns'], fk['referenced_columns']), start=1):
+                self.conn.execute(
+                    "INSERT INTO EXA_ALL_CONSTRAINT_COLUMNS VALUES (?, ?, ?, ?)",
+                    (schema, constraint_name, name, pos)
+                )
+                self.conn.execute(
+                    "INSERT INTO EXA_ALL_FOREIGN_KEYS VALUES (?, ?, ?, ?, ?)",
+                    (schema, constraint_name, name, fk['references'], referenced)
+                )
+    
+    def execute(self, query):
+        """Führt eine Abfrage aus und gibt das Ergebnis als Liste von Wörterbüchern zurück."""
+        with self.lock:
+            cursor = self.conn.execute(self._translate(query))
+            headers = [d[0].split('.')[-1].upper() for d in cursor.description or []]
+            return [
+                {header: ('' if value is None else str(value)) for header, value in zip(headers, row)}
+                for row in cursor.fetchall()
+            ]
+    
+    def execute_batch(self, queries):
+        """Führt mehrere Abfragen nacheinander aus."""
+        return [self.execute(query) for query in queries]
+    
+    def stream_query(self, query):
+        """Liefert das Ergebnis einer Abfrage als Strom von CSV-Zeilen (mit Header)."""
+        with self.lock:
+            cursor = self.conn.execute(self._translate(query))
+            headers = [d[0].split('.')[-1].upper() for d in cursor.description]
+            rows = cursor.fetchall()
+        
+        yield format_csv_line(headers)
+        for row in rows:
+            yield format_csv_line(row)
+    
+    def close(self):
+        """Schließt die SQLite-Datenbank."""
+        self.conn.close()
+
+def session_class(dsn):
+    """Gibt die Sitzungsklasse zurück, die connect() für die DSN verwendet."""
+    if dsn.startswith('fake:'):
+        return FakeExasolSession
+    if pyexasol is not None and DSN_PATTERN.match(dsn):
+        return PyexasolSession
+    return ExaplusSession
+
+def connect(dsn):
+    """Öffnet eine neue Sitzung passend zur DSN."""
+    cls = session_class(dsn)
+    if cls is FakeExasolSession:
+        return FakeExasolSession(dsn[len('fake:'):])
+    return cls(dsn)
+
+class ExasolSessionPool:
+    """
+    Pool langlebiger Exasol-Sitzungen für eine DSN.
+    
+    Threads eines Prozesses teilen sich den Pool; im Prozess-Modus hat jeder
+    Worker-Prozess seinen eigenen. Die Obergrenze gilt nur für Treiber-
+    Verbindungen; exaplus-Sitzungen sind zustandslos und werden nicht begrenzt.
+    Export und Streaming halten eine Sitzung für einen ganzen Chunk, daher
+    muss die Obergrenze mindestens der Zahl der Worker (plus Planung)
+    entsprechen, siehe reserve().
+    """
+    
+    def __init__(self, dsn, max_sessions=8):
+        """Initialisiert den Pool; Sitzungen werden bei Bedarf geöffnet."""
+        self.dsn = dsn
+        self.max_sessions = None if session_class(dsn) is ExaplusSession else max_sessions
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.opened = 0
+    
+    @contextmanager
+    def session(self):
+        """Leiht eine Sitzung aus und gibt sie danach an den Pool zurück."""
+        session = self._acquire()
+        completed = False
+        try:
+            yield session
+            completed = True
+        finally:
+            if completed:
+                self.idle.put(session)
+            else:
+                # Sitzung nach einem Fehler oder Abbruch nicht wiederverwenden
+                self._discard(session)
+    
+    def _acquire(self):
+        """Gibt eine freie Sitzung zurück oder öffnet eine neue."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        while True:
+            with self.lock:
+                if self.max_sessions is None or self.opened < self.max_sessions:
+                    self.opened += 1
+                    break
+            
+            # Pool ausgeschöpft: auf eine zurückgegebene Sitzung warten; nach
+            # Ablauf erneut prüfen, ob durch _discard ein Platz frei wurde
+            try:
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                pass
+        
+        try:
+            return connect(self.dsn)
+        except Exception:
+            with self.lock:
+                self.opened -= 1
+            raise
+    
+    def reserve(self, sessions):
+        """Hebt die Obergrenze auf mindestens die angegebene Zahl von Sitzungen an."""
+        with self.lock:
+            if self.max_sessions is not None and self.max_sessions < sessions:
+                self.max_sessions = sessions
+    
+    def _discard(self, session):
+        """Schließt eine fehlerhafte Sitzung und gibt ihren Platz frei."""
+        try:
+            session.close()
+        except Exception as e:
+            logger.debug(f"Fehler beim Schließen der Exasol-Sitzung: {str(e)}")
+        with self.lock:
+            self.opened -= 1
+    
+    def close(self):
+        """Schließt alle freien Sitzungen."""
+        while True:
+            try:
+                session = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(dsn, min_sessions=None):
+    """Gibt den prozessweiten Sitzungspool für eine DSN zurück (mit mindestens min_sessions Plätzen)."""
+    with _pools_lock:
+        if dsn not in _pools:
+            _pools[dsn] = ExasolSessionPool(dsn)
+        pool = _pools[dsn]
+    if min_sessions:
+        pool.reserve(min_sessions)
+    return pool
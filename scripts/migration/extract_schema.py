@@ -9,6 +9,7 @@ in ein PostgreSQL-kompatibles Format für ExaPG.
 
 Beispielverwendung:
     python3 extract_schema.py --source-dsn "exa:user/password@host:port" --output schema.sql
+    python3 extract_schema.py --source-dsn "exa:user/password@host:port" --output schema/ --split table
 """
 
 import os
@@ -16,9 +17,11 @@ import sys
 import argparse
 import logging
 import re
-import subprocess
-import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+
+import exasol_session
 
 # Logging-Konfiguration
 logging.basicConfig(
@@ -144,52 +147,18 @@ GROUP BY
 
 def run_exasol_query(dsn, query):
     """Führt eine SQL-Abfrage gegen Exasol aus und gibt das Ergebnis zurück."""
+    return run_exasol_queries(dsn, [query])[0]
+
+def run_exasol_queries(dsn, queries):
+    """Führt mehrere SQL-Abfragen in einem Durchlauf über eine gepoolte Exasol-Sitzung aus."""
     try:
-        # Temporäre Datei für die Abfrage erstellen
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.sql', delete=False) as query_file:
-            query_file.write(query)
-            query_file_path = query_file.name
-        
-        # Temporäre Datei für das Ergebnis erstellen
-        result_file_path = tempfile.mktemp(suffix='.csv')
-        
-        # Befehl zum Ausführen der Abfrage mit exaplus
-        cmd = [
-            'exaplus', '-c', dsn, 
-            '-q', query_file_path, 
-            '-o', result_file_path,
-            '-L', '-x', '-s', ','
-        ]
-        
-        # Abfrage ausführen
-        subprocess.check_call(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Ergebnis einlesen
-        with open(result_file_path, 'r') as f:
-            result = f.read().strip()
-        
-        # Temporäre Dateien löschen
-        os.unlink(query_file_path)
-        os.unlink(result_file_path)
-        
-        # CSV in Liste von Wörterbüchern konvertieren
-        lines = result.strip().split('\n')
-        headers = lines[0].split(',')
-        data = []
-        
-        for line in lines[1:]:
-            values = line.split(',')
-            row = {}
-            for i, header in enumerate(headers):
-                row[header.strip()] = values[i] if i < len(values) else None
-            data.append(row)
-        
-        return data
-    
+        with exasol_session.get_pool(dsn).session() as session:
+            return session.execute_batch(queries)
     except Exception as e:
         logger.error(f"Fehler bei der Ausführung der Exasol-Abfrage: {str(e)}")
         raise
 
+@lru_cache(maxsize=None)
 def convert_type(exasol_type):
     """Konvertiert einen Exasol-Datentyp in einen PostgreSQL-Datentyp."""
     for pattern, replacement in TYPE_MAPPING.items():
@@ -214,121 +183,382 @@ def convert_default(default_value, column_type):
     
     return default_value
 
-def generate_schema_sql(schema_data, pk_data, fk_data, dist_key_data):
-    """Generiert PostgreSQL-Schema-SQL aus den extrahierten Exasol-Daten."""
-    schema_sql = f"-- Generiert von extract_schema.py am {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-    schema_sql += "-- Konvertiert von Exasol-Schema zu PostgreSQL-Schema für ExaPG\n\n"
+def group_catalog(schema_data, pk_data, fk_data, dist_key_data, include_schemas=None, exclude_schemas=None):
+    """
+    Ordnet die Katalogzeilen nach Schema und Tabelle.
     
-    # Schemaerstellung
-    schemas = set(row['SCHEMA_NAME'] for row in schema_data)
-    for schema in sorted(schemas):
-        schema_sql += f"CREATE SCHEMA IF NOT EXISTS {schema};\n"
+    Gibt {schema: {tabelle: {'columns', 'primary_key', 'foreign_keys', 'distribution_keys'}}}
+    zurück, gefiltert nach den ein- bzw. ausgeschlossenen Schemas.
+    """
+    include = set(s.strip().upper() for s in include_schemas.split(',')) if include_schemas else None
+    exclude = set(s.strip().upper() for s in exclude_schemas.split(',')) if exclude_schemas else set()
     
-    schema_sql += "\n-- Tabellendefinitionen\n"
+    def selected(schema):
+        return (include is None or schema.upper() in include) and schema.upper() not in exclude
     
-    # Tabellen nach Schema und Namen organisieren
-    tables = {}
+    catalog = {}
     for row in schema_data:
         schema = row['SCHEMA_NAME']
-        table = row['OBJECT_NAME']
-        key = (schema, table)
-        
-        if key not in tables:
-            tables[key] = []
-        
-        tables[key].append(row)
+        if not selected(schema):
+            continue
+        table = catalog.setdefault(schema, {}).setdefault(row['OBJECT_NAME'], {
+            'columns': [], 'primary_key': None, 'foreign_keys': [], 'distribution_keys': None
+        })
+        table['columns'].append(row)
     
-    # Distribution Keys in ein Dictionary für einfachen Zugriff konvertieren
-    dist_keys = {}
-    for row in dist_key_data:
-        key = (row['SCHEMA_NAME'], row['TABLE_NAME'])
-        dist_keys[key] = row['DISTRIBUTION_KEYS']
+    def table_entry(row):
+        return catalog.get(row['SCHEMA_NAME'], {}).get(row['TABLE_NAME'])
     
-    # Primärschlüssel in ein Dictionary konvertieren
-    primary_keys = {}
     for row in pk_data:
-        key = (row['SCHEMA_NAME'], row['TABLE_NAME'])
-        primary_keys[key] = row['KEY_COLUMNS']
+        entry = table_entry(row)
+        if entry:
+            entry['primary_key'] = row['KEY_COLUMNS']
     
-    # Fremdschlüssel nach Tabellen gruppieren
-    foreign_keys = {}
     for row in fk_data:
-        key = (row['SCHEMA_NAME'], row['TABLE_NAME'])
-        if key not in foreign_keys:
-            foreign_keys[key] = []
-        foreign_keys[key].append(row)
-    
-    # Tabellen erstellen
-    for (schema, table), columns in sorted(tables.items()):
-        schema_sql += f"\nCREATE TABLE {schema}.{table} (\n"
-        
-        # Spalten hinzufügen
-        for i, col in enumerate(sorted(columns, key=lambda x: int(x['COLUMN_ORDINAL_POSITION']))):
-            col_name = col['COLUMN_NAME']
-            col_type = convert_type(col['COLUMN_TYPE'])
-            col_nullable = "NULL" if col['COLUMN_IS_NULLABLE'] == 'YES' else "NOT NULL"
-            col_default = f"DEFAULT {convert_default(col['COLUMN_DEFAULT'], col['COLUMN_TYPE'])}" if col['COLUMN_DEFAULT'] else ""
-            
-            schema_sql += f"    {col_name} {col_type} {col_nullable} {col_default}"
-            
-            # Primärschlüssel als Spaltenkonstraine hinzufügen
-            if (schema, table) in primary_keys and primary_keys[(schema, table)] == col_name:
-                schema_sql += " PRIMARY KEY"
-            
-            if i < len(columns) - 1 or (schema, table) in primary_keys or (schema, table) in foreign_keys:
-                schema_sql += ","
-            
-            schema_sql += "\n"
+        entry = table_entry(row)
+        if entry:
+            entry['foreign_keys'].append(row)
+    
+    for row in dist_key_data:
+        entry = table_entry(row)
+        if entry:
+            entry['distribution_keys'] = row['DISTRIBUTION_KEYS']
+    
+    return catalog
+
+def _referenced_table(fk, schema):
+    """Gibt (schema, tabelle) der von einem Fremdschlüssel referenzierten Tabelle zurück."""
+    name = fk['REFERENCED_TABLE']
+    if '.' in name:
+        ref_schema, ref_table = name.split('.', 1)
+        return ref_schema, ref_table
+    return schema, name
+
+def _split_columns(columns):
+    """Zerlegt eine kommagetrennte Spaltenliste."""
+    return [c.strip() for c in columns.split(',') if c.strip()]
+
+def plan_citus(catalog, columnar_min_columns=None):
+    """
+    Leitet die Citus-Verteilung aus Distribution Keys und Fremdschlüsselgraph ab.
+    
+    - Tabellen mit Distribution Key werden nach dessen erster Spalte verteilt.
+      Citus verlangt, dass der Primärschlüssel die Verteilungsspalte enthält;
+      ist das nicht der Fall, wird nach einer Spalte des Primärschlüssels
+      verteilt (bevorzugt einer, die auch im Distribution Key steht).
+    - Verteilte Tabellen, die über einen Fremdschlüssel auf der Verteilungsspalte
+      (gleichen Typs) verbunden sind, bilden eine Kolokationsgruppe.
+    - Tabellen ohne Distribution Key, auf die Fremdschlüssel verweisen, werden
+      Referenztabellen; alle übrigen bleiben lokal.
+    - Fremdschlüssel, die Citus so nicht unterstützt (zwischen nicht kolokierten
+      verteilten Tabellen, von Referenz- oder lokalen auf verteilte Tabellen),
+      werden vor der Verteilung entfernt.
+    
+    Mit columnar_min_columns werden breite Faktentabellen (verteilt, mindestens
+    so viele Spalten, nicht referenziert) als 'columnar' markiert.
+    Gibt eine Liste von Zeilen für generate_citus_sql zurück.
+    """
+    tables = {(schema, table): entry for schema in catalog for table, entry in catalog[schema].items()}
+    
+    def column_type(key, column):
+        for col in tables[key]['columns']:
+            if col['COLUMN_NAME'].upper() == column.upper():
+                return convert_type(col['COLUMN_TYPE'])
+        return None
+    
+    # Verteilungsspalten
+    distributed = {}
+    notes = []
+    for key, entry in sorted(tables.items()):
+        if not entry['distribution_keys']:
+            continue
+        columns = _split_columns(entry['distribution_keys'])
+        column = columns[0]
+        pk_columns = _split_columns(entry['primary_key']) if entry['primary_key'] else []
+        pk_upper = [c.upper() for c in pk_columns]
+        if pk_columns and column.upper() not in pk_upper:
+            column = next((c for c in columns if c.upper() in pk_upper), pk_columns[0])
+            message = (
+                f"{key[0]}.{key[1]}: Distribution Key {entry['distribution_keys']} ist nicht Teil des "
+                f"Primärschlüssels ({entry['primary_key']}), verteile nach {column}"
+            )
+            logger.warning(message)
+            notes.append(f"-- HINWEIS: {message}\n")
+        elif len(columns) > 1:
+            logger.warning(
+                f"{key[0]}.{key[1]}: Citus verteilt nach einer Spalte, verwende {column} "
+                f"von {entry['distribution_keys']}"
+            )
+        distributed[key] = column
+    
+    # Fremdschlüsselkanten (Kind, Eltern, Fremdschlüssel) innerhalb des Katalogs
+    edges = []
+    for key, entry in sorted(tables.items()):
+        for fk in entry['foreign_keys']:
+            parent = _referenced_table(fk, key[0])
+            if parent in tables:
+                edges.append((key, parent, fk))
+    referenced = set(parent for _, parent, _ in edges)
+    reference = set(key for key in tables if key not in distributed and key in referenced)
+    
+    # Kolokationsgruppen über Union-Find entlang der Verteilungsspalten
+    group_of = {key: key for key in distributed}
+    
+    def find(key):
+        while group_of[key] != key:
+            group_of[key] = group_of[group_of[key]]
+            key = group_of[key]
+        return key
+    
+    def colocatable(child, parent, fk):
+        if child not in distributed or parent not in distributed:
+            return False
+        pairs = zip(_split_columns(fk['KEY_COLUMNS']), _split_columns(fk['REFERENCED_COLUMNS']))
+        return any(
+            c.upper() == distributed[child].upper() and r.upper() == distributed[parent].upper()
+            for c, r in pairs
+        ) and column_type(child, distributed[child]) == column_type(parent, distributed[parent])
+    
+    for child, parent, fk in edges:
+        if colocatable(child, parent, fk):
+            group_of[find(child)] = find(parent)
+    
+    # Nicht unterstützte Fremdschlüssel
+    dropped = []
+    for child, parent, fk in edges:
+        if parent in distributed and not colocatable(child, parent, fk):
+            dropped.append((child, parent, fk))
+    
+    # Elterntabellen vor ihren Kindern verteilen
+    order = []
+    visited = set()
+    parents = {}
+    for child, parent, _ in edges:
+        if child != parent:
+            parents.setdefault(child, []).append(parent)
+    
+    def visit(key):
+        if key in visited:
+            return
+        visited.add(key)
+        for parent in sorted(parents.get(key, [])):
+            visit(parent)
+        order.append(key)
+    
+    for key in sorted(tables):
+        visit(key)
+    
+    # Breite Faktentabellen spaltenorientiert speichern
+    if columnar_min_columns:
+        for key in distributed:
+            entry = tables[key]
+            if len(entry['columns']) >= columnar_min_columns and key not in referenced:
+                entry['columnar'] = True
+    
+    lines = list(notes)
+    for child, parent, fk in dropped:
+        lines.append(
+            f"-- WARNUNG: {fk['CONSTRAINT_NAME']} ({child[0]}.{child[1]} -> {parent[0]}.{parent[1]}) "
+            f"wird von Citus nicht unterstützt\n"
+        )
+        lines.append(f"ALTER TABLE {child[0]}.{child[1]} DROP CONSTRAINT {fk['CONSTRAINT_NAME']};\n")
+    
+    # Referenztabellen zuerst, damit Fremdschlüssel auf sie beim Verteilen bestehen bleiben
+    for key in order:
+        if key in reference:
+            lines.append(f"SELECT create_reference_table('{key[0].lower()}.{key[1].lower()}');\n")
+    
+    anchors = {}
+    for key in order:
+        if key not in distributed:
+            continue
+        name = f"{key[0].lower()}.{key[1].lower()}"
+        group = find(key)
+        if group in anchors:
+            lines.append(
+                f"SELECT create_distributed_table('{name}', '{distributed[key].lower()}', "
+                f"colocate_with => '{anchors[group]}');\n"
+            )
+        else:
+            anchors[group] = name
+            lines.append(f"SELECT create_distributed_table('{name}', '{distributed[key].lower()}');\n")
+    
+    local = [key for key in order if key not in distributed and key not in reference]
+    if local:
+        lines.append(f"-- {len(local)} Tabellen ohne Distribution Key bleiben lokal auf dem Koordinator\n")
+    
+    return lines
+
+def generate_citus_sql(citus_lines):
+    """Generiert den Abschnitt mit der Citus-Verteilung."""
+    return (
+        "\n-- Citus-Verteilung (abgeleitet aus Distribution Keys und Fremdschlüsseln)\n"
+        "CREATE EXTENSION IF NOT EXISTS citus;\n"
+        + ''.join(citus_lines)
+    )
+
+def extension_sql(entries):
+    """CREATE EXTENSION vor der Tabellen-DDL, wenn eine Tabelle die Zugriffsmethode columnar braucht."""
+    if any(entry.get('columnar') for entry in entries):
+        return "CREATE EXTENSION IF NOT EXISTS citus;\n"
+    return ""
+
+def generate_table_sql(schema, table, entry):
+    """Generiert das CREATE TABLE (samt Distribution-Key-Hinweisen) einer Tabelle."""
+    primary_key = entry['primary_key']
+    elements = []
+    
+    # Spalten hinzufügen
+    for col in sorted(entry['columns'], key=lambda x: int(x['COLUMN_ORDINAL_POSITION'])):
+        col_name = col['COLUMN_NAME']
+        col_type = convert_type(col['COLUMN_TYPE'])
+        col_nullable = "NULL" if col['COLUMN_IS_NULLABLE'] == 'YES' else "NOT NULL"
+        col_default = f"DEFAULT {convert_default(col['COLUMN_DEFAULT'], col['COLUMN_TYPE'])}" if col['COLUMN_DEFAULT'] else ""
         
-        # Primärschlüssel als Tabellenkonstraine hinzufügen, wenn mehrere Spalten
-        if (schema, table) in primary_keys and ',' in primary_keys[(schema, table)]:
-            schema_sql += f"    PRIMARY KEY ({primary_keys[(schema, table)]})"
-            if (schema, table) in foreign_keys:
-                schema_sql += ","
-            schema_sql += "\n"
+        element = f"    {col_name} {col_type} {col_nullable} {col_default}"
         
-        # Fremdschlüssel hinzufügen
-        if (schema, table) in foreign_keys:
-            for i, fk in enumerate(foreign_keys[(schema, table)]):
-                schema_sql += f"    CONSTRAINT {fk['CONSTRAINT_NAME']} "
-                schema_sql += f"FOREIGN KEY ({fk['KEY_COLUMNS']}) "
-                schema_sql += f"REFERENCES {fk['REFERENCED_TABLE']} ({fk['REFERENCED_COLUMNS']})"
-                
-                if i < len(foreign_keys[(schema, table)]) - 1:
-                    schema_sql += ","
-                
-                schema_sql += "\n"
+        # Primärschlüssel als Spaltenconstraint hinzufügen
+        if primary_key == col_name:
+            element += " PRIMARY KEY"
+        elements.append(element)
+    
+    # Primärschlüssel als Tabellenconstraint hinzufügen, wenn mehrere Spalten
+    if primary_key and ',' in primary_key:
+        elements.append(f"    PRIMARY KEY ({primary_key})")
+    
+    # Fremdschlüssel hinzufügen
+    for fk in entry['foreign_keys']:
+        elements.append(
+            f"    CONSTRAINT {fk['CONSTRAINT_NAME']} "
+            f"FOREIGN KEY ({fk['KEY_COLUMNS']}) "
+            f"REFERENCES {fk['REFERENCED_TABLE']} ({fk['REFERENCED_COLUMNS']})"
+        )
+    
+    access_method = " USING columnar" if entry.get('columnar') else ""
+    parts = [f"\nCREATE TABLE {schema}.{table} (\n", ",\n".join(elements), f"\n){access_method};\n"]
+    
+    # Distribution Keys in Partitionierung umwandeln, wenn vorhanden (ohne --citus)
+    dist_key_cols = entry['distribution_keys']
+    if dist_key_cols and not entry.get('citus'):
+        parts.append(f"\n-- Hinweis: Originale Exasol Distribution Keys: {dist_key_cols}\n")
+        parts.append("-- Für ExaPG empfehlen wir:\n")
+        parts.append(f"-- ALTER TABLE {schema}.{table} SET (parallel_workers = 8);\n")
         
-        schema_sql += ");\n"
+        # Je nach Spaltentyp unterschiedliche Partitionierungsvorschläge
+        if re.search(r'(date|time|timestamp)', dist_key_cols, re.IGNORECASE):
+            parts.append("-- ODER Zeitbasierte Partitionierung:\n")
+            partition = f"RANGE ({dist_key_cols})"
+        else:
+            parts.append("-- ODER Hash-Partitionierung:\n")
+            partition = f"HASH ({dist_key_cols})"
+        parts.append(f"-- CREATE TABLE {schema}.{table}_partitioned (\n")
+        parts.append(f"--     LIKE {schema}.{table} INCLUDING ALL\n")
+        parts.append(f"-- ) PARTITION BY {partition};\n")
+    
+    return ''.join(parts)
+
+def file_header():
+    """Kopfzeilen jeder generierten Datei."""
+    return (
+        f"-- Generiert von extract_schema.py am {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        "-- Konvertiert von Exasol-Schema zu PostgreSQL-Schema für ExaPG\n\n"
+    )
+
+def _generate_schema_task(task):
+    """
+    Generiert die DDL eines Schemas (im Worker-Prozess).
+    
+    Bei split='none' wird der Text zurückgegeben, sonst schreibt der Worker
+    eine Datei pro Schema bzw. Tabelle direkt und gibt deren Anzahl zurück.
+    """
+    schema, tables, split, output = task
+    
+    if split == 'none':
+        return schema, ''.join(generate_table_sql(schema, table, entry) for table, entry in sorted(tables.items()))
+    
+    if split == 'schema':
+        with open(os.path.join(output, f"{schema}.sql"), 'w') as f:
+            f.write(file_header())
+            f.write(extension_sql(tables.values()))
+            f.write(f"CREATE SCHEMA IF NOT EXISTS {schema};\n")
+            for table, entry in sorted(tables.items()):
+                f.write(generate_table_sql(schema, table, entry))
+        return schema, 1
+    
+    schema_dir = os.path.join(output, schema)
+    os.makedirs(schema_dir, exist_ok=True)
+    for table, entry in sorted(tables.items()):
+        with open(os.path.join(schema_dir, f"{table}.sql"), 'w') as f:
+            f.write(file_header())
+            f.write(extension_sql([entry]))
+            f.write(f"CREATE SCHEMA IF NOT EXISTS {schema};\n")
+            f.write(generate_table_sql(schema, table, entry))
+    return schema, len(tables)
+
+def write_schema_sql(catalog, output, split='none', jobs=None, citus_lines=None):
+    """
+    Schreibt die DDL aller Schemas, pro Schema parallel generiert.
+    
+    split='none' schreibt eine Datei output und hängt die Schemas in fester
+    Reihenfolge an, sobald sie fertig sind; 'schema' bzw. 'table' schreiben
+    eine Datei pro Schema bzw. Tabelle in das Verzeichnis output. Die
+    Citus-Verteilung folgt am Ende der Datei bzw. in citus_distribution.sql.
+    """
+    schemas = sorted(catalog)
+    tasks = [(schema, catalog[schema], split, output) for schema in schemas]
+    jobs = jobs or os.cpu_count() or 1
+    
+    if split != 'none':
+        os.makedirs(output, exist_ok=True)
+    
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(tasks) > 1 else None
+    results = executor.map(_generate_schema_task, tasks) if executor else map(_generate_schema_task, tasks)
+    
+    try:
+        if split != 'none':
+            files = sum(count for _, count in results)
+            if citus_lines is not None:
+                with open(os.path.join(output, 'citus_distribution.sql'), 'w') as f:
+                    f.write(file_header())
+                    f.write(generate_citus_sql(citus_lines))
+                files += 1
+            logger.info(f"{files} Dateien für {len(schemas)} Schemas nach {output} geschrieben")
+            return files
         
-        # Distribution Keys in Partitionierung umwandeln, wenn vorhanden
-        if (schema, table) in dist_keys:
-            dist_key_cols = dist_keys[(schema, table)]
-            schema_sql += f"\n-- Hinweis: Originale Exasol Distribution Keys: {dist_key_cols}\n"
-            schema_sql += f"-- Für ExaPG empfehlen wir:\n"
-            schema_sql += f"-- ALTER TABLE {schema}.{table} SET (parallel_workers = 8);\n"
+        with open(output, 'w') as f:
+            f.write(file_header())
+            f.write(extension_sql(entry for tables in catalog.values() for entry in tables.values()))
+            for schema in schemas:
+                f.write(f"CREATE SCHEMA IF NOT EXISTS {schema};\n")
+            f.write("\n-- Tabellendefinitionen\n")
+            
+            for schema, ddl in results:
+                f.write(ddl)
+                logger.debug(f"Schema {schema} geschrieben")
             
-            # Je nach Spaltentyp unterschiedliche Partitionierungsvorschläge
-            date_col_match = re.search(r'(date|time|timestamp)', dist_key_cols, re.IGNORECASE)
-            if date_col_match:
-                schema_sql += f"-- ODER Zeitbasierte Partitionierung:\n"
-                schema_sql += f"-- CREATE TABLE {schema}.{table}_partitioned (\n"
-                schema_sql += f"--     LIKE {schema}.{table} INCLUDING ALL\n"
-                schema_sql += f"-- ) PARTITION BY RANGE ({dist_key_cols});\n"
-            else:
-                schema_sql += f"-- ODER Hash-Partitionierung:\n"
-                schema_sql += f"-- CREATE TABLE {schema}.{table}_partitioned (\n"
-                schema_sql += f"--     LIKE {schema}.{table} INCLUDING ALL\n"
-                schema_sql += f"-- ) PARTITION BY HASH ({dist_key_cols});\n"
-    
-    return schema_sql
+            if citus_lines is not None:
+                f.write(generate_citus_sql(citus_lines))
+        return 1
+    finally:
+        if executor:
+            executor.shutdown()
 
 def main():
     """Hauptfunktion."""
     parser = argparse.ArgumentParser(description='Extrahiert das Schema aus einer Exasol-Datenbank für ExaPG')
     
     parser.add_argument('--source-dsn', required=True, help='Exasol-DSN im Format "exa:user/password@host:port"')
-    parser.add_argument('--output', required=True, help='Ausgabedatei für das generierte SQL-Schema')
+    parser.add_argument('--output', required=True, 
+                        help='Ausgabedatei für das generierte SQL-Schema (bei --split schema/table ein Verzeichnis)')
+    parser.add_argument('--split', choices=['none', 'schema', 'table'], default='none', 
+                        help='Eine Datei insgesamt (Standard), pro Schema oder pro Tabelle schreiben')
+    parser.add_argument('--jobs', type=int, 
+                        help='Anzahl paralleler Prozesse für die DDL-Generierung (Standard: alle Kerne)')
+    parser.add_argument('--citus', action='store_true', 
+                        help='Tabellen per create_distributed_table/create_reference_table verteilen, '
+                             'Kolokationsgruppen aus den Fremdschlüsseln ableiten')
+    parser.add_argument('--columnar-min-columns', type=int, 
+                        help='Verteilte, nicht referenzierte Tabellen ab dieser Spaltenzahl mit USING columnar anlegen')
     parser.add_argument('--include-schemas', help='Kommagetrennte Liste der zu extrahierenden Schemas (Standard: alle)')
     parser.add_argument('--exclude-schemas', default='SYS,EXA_STATISTICS,EXA_LOGS', 
                         help='Kommagetrennte Liste der zu ignorierenden Schemas (Standard: SYS,EXA_STATISTICS,EXA_LOGS)')
@@ -336,31 +566,35 @@ def main():
     
     args = parser.parse_args()
     
+    if args.columnar_min_columns is not None and not args.citus:
+        parser.error("--columnar-min-columns erfordert --citus")
+    
     # Verbose-Modus
     if args.verbose:
         logger.setLevel(logging.DEBUG)
     
     try:
-        # Schema-Daten extrahieren
-        logger.info("Extrahiere Tabellen- und Spaltendefinitionen...")
-        schema_data = run_exasol_query(args.source_dsn, SCHEMA_EXTRACTION_SQL)
+        # Spalten, Primär-, Fremd- und Distribution Keys in einem Durchlauf extrahieren
+        logger.info("Extrahiere Tabellen, Spalten, Schlüssel und Distribution Keys...")
+        schema_data, pk_data, fk_data, dist_key_data = run_exasol_queries(args.source_dsn, [
+            SCHEMA_EXTRACTION_SQL,
+            PRIMARY_KEY_SQL,
+            FOREIGN_KEY_SQL,
+            DISTRIBUTION_KEY_SQL
+        ])
         
-        logger.info("Extrahiere Primärschlüssel...")
-        pk_data = run_exasol_query(args.source_dsn, PRIMARY_KEY_SQL)
-        
-        logger.info("Extrahiere Fremdschlüssel...")
-        fk_data = run_exasol_query(args.source_dsn, FOREIGN_KEY_SQL)
-        
-        logger.info("Extrahiere Distribution Keys...")
-        dist_key_data = run_exasol_query(args.source_dsn, DISTRIBUTION_KEY_SQL)
-        
-        # Schema-SQL generieren
+        # Schema-SQL pro Schema parallel generieren und direkt schreiben
         logger.info("Generiere PostgreSQL-Schema...")
-        schema_sql = generate_schema_sql(schema_data, pk_data, fk_data, dist_key_data)
-        
-        # Ausgabedatei schreiben
-        with open(args.output, 'w') as f:
-            f.write(schema_sql)
+        catalog = group_catalog(
+            schema_data, pk_data, fk_data, dist_key_data, args.include_schemas, args.exclude_schemas
+        )
+        citus_lines = None
+        if args.citus:
+            citus_lines = plan_citus(catalog, args.columnar_min_columns)
+            for tables in catalog.values():
+                for entry in tables.values():
+                    entry['citus'] = True
+        write_schema_sql(catalog, args.output, args.split, args.jobs, citus_lines)
         
         logger.info(f"Schema erfolgreich nach {args.output} extrahiert und konvertiert")
         return 0
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Metriken und Fortschrittsanzeige für parallel_migrator.py
+
+Sammelt die Ergebnisse der einzelnen Chunks (Zeilen, Bytes, Export- und
+Importdauer) sowie Warteschlangentiefe und Worker-Auslastung und stellt sie
+über einen kleinen HTTP-Server bereit:
+
+    /metrics   -> Prometheus-Textformat (Job exapg_migration in monitoring/)
+    /progress  -> JSON mit Fortschritt und ETA je Tabelle und gesamt
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('migration_metrics')
+
+# Zeitfenster in Sekunden für die aktuelle Rate (Zeilen/s)
+RATE_WINDOW = 60
+
+def _escape_label(value):
+    """Maskiert einen Label-Wert für das Prometheus-Textformat."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_eta(seconds):
+    """Rundet eine ETA für die JSON-Ausgabe (None, falls unbekannt)."""
+    return None if seconds is None else round(seconds, 1)
+
+class MigrationMetrics:
+    """Thread-sichere Sammlung der Migrationsmetriken."""
+    
+    def __init__(self):
+        """Initialisiert leere Zähler."""
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.tables = {}
+        self.recent = deque()
+        self.busy_seconds = 0.0
+        self.worker_seconds = 0.0
+        self.last_sample = self.start_time
+        self.queue_depth = 0
+        self.active_workers = 0
+        self.planning_complete = False
+    
+    def _table(self, schema, table):
+        """Gibt den Zählersatz einer Tabelle zurück und legt ihn bei Bedarf an."""
+        key = (schema, table)
+        if key not in self.tables:
+            self.tables[key] = {
+                'estimated_rows': None,
+                'planned_chunks': 0,
+                'chunks': {'success': 0, 'warning': 0, 'error': 0},
+                'exported_rows': 0,
+                'imported_rows': 0,
+                'bytes': 0,
+                'export_seconds': 0.0,
+                'import_seconds': 0.0,
+                'started': None,
+                'finished': None
+            }
+        return self.tables[key]
+    
+    def record_plan(self, schema, table, chunks, estimated_rows=None):
+        """Hält die geplanten Chunks und die geschätzte Zeilenzahl einer Tabelle fest."""
+        with self.lock:
+            entry = self._table(schema, table)
+            entry['planned_chunks'] += chunks
+            if estimated_rows is not None:
+                entry['estimated_rows'] = estimated_rows
+    
+    def record_result(self, result):
+        """Verbucht das Ergebnis eines Chunks."""
+        if result.get('schema') is None or result.get('table') is None:
+            return
+        
+        now = time.time()
+        with self.lock:
+            entry = self._table(result['schema'], result['table'])
+            status = result.get('status', 'error')
+            entry['chunks'][status] = entry['chunks'].get(status, 0) + 1
+            entry['exported_rows'] += result.get('exported_rows') or 0
+            entry['imported_rows'] += result.get('imported_rows') or 0
+            entry['bytes'] += result.get('bytes') or 0
+            entry['export_seconds'] += result.get('export_duration') or 0.0
+            entry['import_seconds'] += result.get('import_duration') or 0.0
+            
+            duration = result.get('duration') or 0.0
+            if entry['started'] is None:
+                entry['started'] = now - duration
+            # Eine Tabelle wird vollständig geplant, bevor ihr erster Chunk startet
+            if sum(entry['chunks'].values()) >= entry['planned_chunks']:
+                entry['finished'] = now
+            
+            self.busy_seconds += duration
+            self.recent.append((now, result.get('imported_rows') or 0))
+    
+    def sample(self, queue_depth, active_workers, planning_complete):
+        """Aktualisiert Warteschlangentiefe und Workerzahl und integriert die verfügbare Workerzeit."""
+        now = time.time()
+        with self.lock:
+            self.worker_seconds += self.active_workers * (now - self.last_sample)
+            self.last_sample = now
+            self.queue_depth = queue_depth
+            self.active_workers = active_workers
+            self.planning_complete = planning_complete
+    
+    def _rate(self, now):
+        """Importierte Zeilen pro Sekunde im letzten Zeitfenster."""
+        while self.recent and self.recent[0][0] < now - RATE_WINDOW:
+            self.recent.popleft()
+        window = min(RATE_WINDOW, now - self.start_time)
+        if window <= 0:
+            return 0.0
+        return sum(rows for _, rows in self.recent) / window
+    
+    def _utilization(self):
+        """Anteil der verfügbaren Workerzeit, in der Chunks verarbeitet wurden."""
+        if self.worker_seconds <= 0:
+            return 0.0
+        return min(self.busy_seconds / self.worker_seconds, 1.0)
+    
+    @staticmethod
+    def _table_eta(entry, now):
+        """Schätzt die Restlaufzeit einer Tabelle aus ihrer bisherigen Rate."""
+        if entry['finished']:
+            return 0.0
+        if not entry['started']:
+            return None
+        
+        elapsed = now - entry['started']
+        done_chunks = sum(entry['chunks'].values())
+        if entry['estimated_rows'] and entry['imported_rows']:
+            remaining = max(entry['estimated_rows'] - entry['imported_rows'], 0)
+            return remaining / (entry['imported_rows'] / elapsed)
+        if done_chunks and entry['planned_chunks']:
+            # Ohne Zeilenschätzung (z. B. bei --resume) über die Chunks hochrechnen
+            return (entry['planned_chunks'] - done_chunks) * elapsed / done_chunks
+        return None
+    
+    def progress(self):
+        """Gibt den aktuellen Fortschritt als Wörterbuch für den JSON-Endpunkt zurück."""
+        now = time.time()
+        with self.lock:
+            rate = self._rate(now)
+            tables = []
+            remaining_rows = 0
+            remaining_known = self.planning_complete
+            for (schema, table), entry in sorted(self.tables.items()):
+                done_chunks = sum(entry['chunks'].values())
+                if entry['finished']:
+                    pass
+                elif entry['estimated_rows'] is not None:
+                    remaining_rows += max(entry['estimated_rows'] - entry['imported_rows'], 0)
+                elif not entry['finished']:
+                    remaining_known = False
+                
+                tables.append({
+                    'schema': schema,
+                    'table': table,
+                    'estimated_rows': entry['estimated_rows'],
+                    'exported_rows': entry['exported_rows'],
+                    'imported_rows': entry['imported_rows'],
+                    'bytes': entry['bytes'],
+                    'planned_chunks': entry['planned_chunks'],
+                    'done_chunks': done_chunks,
+                    'failed_chunks': entry['chunks'].get('error', 0),
+                    'export_seconds': round(entry['export_seconds'], 3),
+                    'import_seconds': round(entry['import_seconds'], 3),
+                    'percent': round(100.0 * done_chunks / entry['planned_chunks'], 1) if entry['planned_chunks'] else 0.0,
+                    'eta_seconds': _format_eta(self._table_eta(entry, now))
+                })
+            
+            planned = sum(t['planned_chunks'] for t in tables)
+            done = sum(t['done_chunks'] for t in tables)
+            if remaining_known and remaining_rows == 0 and done >= planned:
+                eta = 0.0
+            elif remaining_known and rate > 0:
+                eta = remaining_rows / rate
+            elif self.planning_complete and all(t['eta_seconds'] is not None for t in tables):
+                # Tabellen laufen parallel, die langsamste bestimmt das Ende
+                eta = max(t['eta_seconds'] for t in tables)
+            else:
+                eta = None
+            
+            return {
+                'elapsed_seconds': round(now - self.start_time, 1),
+                'planning_complete': self.planning_complete,
+                'planned_chunks': planned,
+                'done_chunks': done,
+                'imported_rows': sum(t['imported_rows'] for t in tables),
+                'bytes': sum(t['bytes'] for t in tables),
+                'rows_per_second': round(rate, 1),
+                'queue_depth': self.queue_depth,
+                'active_workers': self.active_workers,
+                'worker_utilization': round(self._utilization(), 3),
+                'eta_seconds': _format_eta(eta),
+                'tables': tables
+            }
+    
+    def prometheus(self):
+        """Gibt alle Metriken im Prometheus-Textformat zurück."""
+        progress = self.progress()
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        
+        def per_table(key):
+            return [({'schema': t['schema'], 'table': t['table']}, t[key]) for t in progress['tables']]
+        
+        metric('exapg_migration_rows_exported_total', 'counter',
+               'Aus Exasol exportierte Zeilen', per_table('exported_rows'))
+        metric('exapg_migration_rows_imported_total', 'counter',
+               'Per COPY importierte Zeilen', per_table('imported_rows'))
+        metric('exapg_migration_bytes_total', 'counter',
+               'Exportierte CSV-Bytes', per_table('bytes'))
+        metric('exapg_migration_export_seconds_total', 'counter',
+               'Summierte Exportdauer der Chunks', per_table('export_seconds'))
+        metric('exapg_migration_import_seconds_total', 'counter',
+               'Summierte Importdauer der Chunks', per_table('import_seconds'))
+        metric('exapg_migration_rows_estimated', 'gauge',
+               'Geschätzte Zeilenzahl laut Exasol-Statistik', per_table('estimated_rows'))
+        metric('exapg_migration_chunks_planned', 'gauge',
+               'Geplante Chunks', per_table('planned_chunks'))
+        metric('exapg_migration_chunks_done', 'gauge',
+               'Abgeschlossene Chunks (inklusive Fehler)', per_table('done_chunks'))
+        metric('exapg_migration_chunks_failed', 'gauge',
+               'Fehlgeschlagene Chunks', per_table('failed_chunks'))
+        metric('exapg_migration_table_eta_seconds', 'gauge',
+               'Geschätzte Restlaufzeit je Tabelle', per_table('eta_seconds'))
+        metric('exapg_migration_rows_per_second', 'gauge',
+               f'Importierte Zeilen pro Sekunde (letzte {RATE_WINDOW}s)', [({}, progress['rows_per_second'])])
+        metric('exapg_migration_queue_depth', 'gauge',
+               'Wartende Chunks in der Aufgabenwarteschlange', [({}, progress['queue_depth'])])
+        metric('exapg_migration_workers_active', 'gauge',
+               'Aktive Worker', [({}, progress['active_workers'])])
+        metric('exapg_migration_worker_utilization', 'gauge',
+               'Anteil der Workerzeit mit laufendem Chunk', [({}, progress['worker_utilization'])])
+        metric('exapg_migration_eta_seconds', 'gauge',
+               'Geschätzte Restlaufzeit der gesamten Migration', [({}, progress['eta_seconds'])])
+        
+        return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """HTTP-Server für /metrics und /progress in einem Hintergrund-Thread."""
+    
+    def __init__(self, metrics, port, host='0.0.0.0'):
+        """Initialisiert den Server."""
+        self.metrics = metrics
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+    
+    def _handler(self):
+        """Erzeugt die Handler-Klasse mit Zugriff auf die Metriken."""
+        metrics = self.metrics
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body = metrics.prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/progress':
+                    body = json.dumps(metrics.progress(), indent=2).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+        
+        return Handler
+    
+    def start(self):
+        """Startet den Server."""
+        thread = threading.Thread(target=self.httpd.serve_forever, name='migration-metrics')
+        thread.daemon = True
+        thread.start()
+        logger.info(f"Metriken unter http://{self.httpd.server_address[0]}:{self.httpd.server_address[1]}/metrics")
+        return thread
+    
+    def stop(self):
+        """Beendet den Server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()